@@ -1,50 +1,74 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List, Dict
+from typing import List, Dict, Optional
+from datetime import date
 
 # ----------------------------
 # Endpoint 1: Top Products
 # ----------------------------
-def get_top_products(db: Session, limit: int = 10) -> List[Dict]:
+def get_top_products(
+    db: Session,
+    limit: int = 10,
+    channel_name: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> List[Dict]:
     """
-    Returns the most frequently mentioned products/terms from fct_messages.
+    Returns the most mentioned dictionary products, optionally for one
+    channel and/or a date range, from the daily product mention rollup.
     """
-    sql = text("""
-        SELECT word AS product, COUNT(*) AS count FROM (
-            SELECT unnest(string_to_array(message_text, ' ')) AS word
-            FROM analytics_analytics.fct_messages
-        ) AS words
-        GROUP BY word
-        ORDER BY count DESC
+    filters = []
+    params = {"limit": limit}
+    if channel_name:
+        filters.append("channel_name = :channel_name")
+        params["channel_name"] = channel_name
+    if start_date:
+        filters.append("date_key >= :start_key")
+        params["start_key"] = int(start_date.strftime("%Y%m%d"))
+    if end_date:
+        filters.append("date_key <= :end_key")
+        params["end_key"] = int(end_date.strftime("%Y%m%d"))
+    where = f"WHERE {' AND '.join(filters)}" if filters else ""
+
+    sql = text(f"""
+        SELECT product_name AS product, SUM(mention_count) AS count
+        FROM analytics_analytics.agg_daily_product_mentions
+        {where}
+        GROUP BY product_name
+        ORDER BY count DESC, product_name
         LIMIT :limit;
     """)
-    result = db.execute(sql, {"limit": limit}).mappings().all()
+    result = db.execute(sql, params).mappings().all()
     return [{"product": row["product"], "count": row["count"]} for row in result]
 
 
 # ----------------------------
 # Endpoint 2: Channel Activity
 # ----------------------------
-def get_channel_activity(db: Session, channel_key: str) -> List[Dict]:
+def get_channel_activity(db: Session, channel_name: str) -> List[Dict]:
     """
-    Returns message counts per day for a given channel.
+    Returns message counts, views and forwards per day for a given channel,
+    read from the dbt-maintained daily rollup.
     """
     sql = text("""
         SELECT
-            channel_key,
-            CAST(date_key AS date) AS date,
-            COUNT(*) AS message_count
-        FROM analytics_analytics.fct_messages
-        WHERE channel_key = :channel_key
-        GROUP BY channel_key, CAST(date_key AS date)
-        ORDER BY date ASC;
+            channel_name,
+            full_date AS date,
+            message_count,
+            total_views,
+            total_forwards
+        FROM analytics_analytics.agg_channel_daily_activity
+        WHERE channel_name = :channel_name
+        ORDER BY date_key ASC;
     """)
-    result = db.execute(sql, {"channel_key": channel_key}).mappings().all()
+    result = db.execute(sql, {"channel_name": channel_name}).mappings().all()
     return [
         {
-            "channel_key": row["channel_key"],
+            "channel_name": row["channel_name"],
             "date": row["date"],
-            "message_count": row["message_count"]
+            "message_count": row["message_count"],
+            "total_views": row["total_views"],
+            "total_forwards": row["total_forwards"]
         }
         for row in result
     ]
@@ -92,22 +116,22 @@ def get_visual_content_stats(db: Session) -> List[Dict]:
       - product_display: product only
       - lifestyle: person only
       - other: neither
-    Assumes fct_image_detections table has 'channel_key' and 'image_category' columns.
+    Sums the per-channel, per-day category rollup maintained by dbt.
     """
     sql = text("""
         SELECT
-            channel_key,
+            channel_name,
             image_category,
-            COUNT(*) AS image_count
-        FROM analytics_analytics.fct_image_detections
-        GROUP BY channel_key, image_category
-        ORDER BY channel_key, image_category;
+            SUM(image_count) AS image_count
+        FROM analytics_analytics.agg_channel_daily_image_categories
+        GROUP BY channel_name, image_category
+        ORDER BY channel_name, image_category;
     """)
     result = db.execute(sql).mappings().all()
     return [
         {
-            "channel_key": row["channel_key"],
-            "image_category": row["image_category"],
+            "channel_name": row["channel_name"],
+            "category": row["image_category"],
             "image_count": row["image_count"]
         }
         for row in result
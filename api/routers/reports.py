@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 from api.database import get_db
 from api.schemas import TopProduct, VisualContentStat
 from api.crud.analytics import get_top_products, get_visual_content_stats
@@ -11,11 +12,17 @@ router = APIRouter()
 # ---------- Endpoint 1: Top Products ----------
 @router.get("/top-products", response_model=List[TopProduct])
 def top_products(limit: int = Query(10, description="Number of top products to return"),
+                 channel: Optional[str] = Query(None, description="Only count mentions in this channel"),
+                 start_date: Optional[date] = Query(None, description="First day to include (YYYY-MM-DD)"),
+                 end_date: Optional[date] = Query(None, description="Last day to include (YYYY-MM-DD)"),
                  db: Session = Depends(get_db)):
     """
-    Returns the most frequently mentioned products/terms across all channels.
+    Returns the most frequently mentioned products, across all channels or
+    for one channel, optionally within a date range.
     """
-    return get_top_products(db=db, limit=limit)
+    return get_top_products(
+        db=db, limit=limit, channel_name=channel, start_date=start_date, end_date=end_date
+    )
 
 
 # ---------- Endpoint 4: Visual Content Stats ----------
@@ -14,6 +14,8 @@ class ChannelActivity(BaseModel):
     channel_name: str
     date: date
     message_count: int
+    total_views: int
+    total_forwards: int
 
 
 # ---------- Message Search ----------
@@ -0,0 +1,141 @@
+"""
+In-process stand-in for telethon's TelegramClient used by the benchmarks.
+
+Produces synthetic channel history and photos with configurable latency,
+media sizes and FloodWait injection, so the real scraping code path can be
+measured without a Telegram account.
+"""
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from telethon.errors import FloodWaitError
+
+PAGE_SIZE = 100
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeMessage:
+    """
+    The subset of telethon's Message that the scraper touches.
+    """
+
+    def __init__(self, client, message_id, date, text, views, forwards, photo_size):
+        self._client = client
+        self.id = message_id
+        self.date = date
+        self.text = text
+        self.views = views
+        self.forwards = forwards
+        self.photo = SimpleNamespace(size=photo_size) if photo_size else None
+        self.media = self.photo
+        self.file = SimpleNamespace(size=photo_size) if photo_size else None
+
+    async def download_media(self, file):
+        return await self._client.download(self, file)
+
+
+class FakeTelegramClient:
+    """
+    Serves `messages_per_channel` synthetic messages for any channel.
+
+    Each page of 100 messages and each download costs a simulated network
+    round-trip; every `flood_wait_every`-th request raises a FloodWaitError
+    of `flood_wait_seconds`.
+    """
+
+    def __init__(
+        self,
+        messages_per_channel=1000,
+        page_latency=0.05,
+        download_latency=0.02,
+        photo_ratio=0.5,
+        media_bytes=200_000,
+        flood_wait_every=0,
+        flood_wait_seconds=1,
+        seed=0,
+    ):
+        self.messages_per_channel = messages_per_channel
+        self.page_latency = page_latency
+        self.download_latency = download_latency
+        self.photo_ratio = photo_ratio
+        self.media_bytes = media_bytes
+        self.flood_wait_every = flood_wait_every
+        self.flood_wait_seconds = flood_wait_seconds
+        self.seed = seed
+
+        self.requests = 0
+        self.flood_waits = 0
+        self.bytes_downloaded = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+    async def _request(self, latency):
+        self.requests += 1
+        if self.flood_wait_every and self.requests % self.flood_wait_every == 0:
+            self.flood_waits += 1
+            raise FloodWaitError(request=None, capture=self.flood_wait_seconds)
+        await asyncio.sleep(latency)
+
+    def _message(self, channel, message_id):
+        rng = random.Random(f"{self.seed}:{channel}:{message_id}")
+        date = self._message_date(message_id)
+        photo_size = self.media_bytes if rng.random() < self.photo_ratio else 0
+        return FakeMessage(
+            self,
+            message_id,
+            date,
+            f"Synthetic post {message_id} in {channel} " * rng.randint(1, 8),
+            rng.randint(0, 50_000),
+            rng.randint(0, 500),
+            photo_size,
+        )
+
+    def _message_date(self, message_id):
+        return EPOCH + timedelta(minutes=message_id)
+
+    async def iter_messages(
+        self, entity, limit=None, min_id=0, max_id=0, offset_id=0, offset_date=None,
+        reverse=False, **kwargs
+    ):
+        """
+        History honouring limit, min_id, max_id, offset_id, offset_date and
+        reverse the way telethon does: newest-first by default, oldest-first
+        (starting after offset_id / offset_date) with reverse.
+        """
+        lowest, highest = min_id + 1, self.messages_per_channel
+        if max_id:
+            highest = min(highest, max_id - 1)
+        if reverse:
+            lowest = max(lowest, offset_id + 1)
+            if offset_date and not offset_id:
+                while lowest <= highest and self._message_date(lowest) < offset_date:
+                    lowest += 1
+            message_ids = range(lowest, highest + 1)
+        else:
+            if offset_id:
+                highest = min(highest, offset_id - 1)
+            message_ids = range(highest, lowest - 1, -1)
+
+        yielded = 0
+        for message_id in message_ids:
+            if limit is not None and yielded >= limit:
+                return
+            if yielded % PAGE_SIZE == 0:
+                await self._request(self.page_latency)
+            yield self._message(entity, message_id)
+            yielded += 1
+
+    async def download(self, message, file):
+        await self._request(self.download_latency)
+        payload = bytes(message.file.size)
+        with open(file, "wb") as f:
+            f.write(payload)
+        self.bytes_downloaded += len(payload)
+        return str(file)
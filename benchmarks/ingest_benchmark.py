@@ -0,0 +1,87 @@
+"""
+Raw-message load throughput benchmark against a local PostgreSQL.
+
+Generates synthetic NDJSON raw files, then loads them with each loader
+mode into a scratch schema (dropped afterwards) and reports rows/sec:
+
+    python -m benchmarks.ingest_benchmark --messages 50000 --files 10
+
+Connection settings come from config/database_config.yaml.
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from src.ingestion import load_telegram_messages as loader
+from src.ingestion.db import db_conf, get_connection
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark raw message loading")
+    parser.add_argument("--messages", type=int, default=20000, help="Total messages")
+    parser.add_argument("--files", type=int, default=4, help="Number of raw files")
+    parser.add_argument("--modes", nargs="+", default=["row", "copy"])
+    parser.add_argument("--workers", type=int, default=1, help="Loader processes")
+    parser.add_argument("--schema", default="bench_raw", help="Scratch schema (dropped after)")
+    return parser.parse_args()
+
+
+def write_raw_files(folder, total, files):
+    rng = random.Random(0)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    per_file = max(1, total // files)
+    message_id = 0
+    for index in range(files):
+        path = Path(folder) / "2026-01-01" / f"bench_{index}-000000-0001.ndjson"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            for _ in range(per_file):
+                message_id += 1
+                f.write(json.dumps({
+                    "message_id": message_id,
+                    "channel_name": f"bench_{index}",
+                    "message_date": (start + timedelta(minutes=message_id)).isoformat(),
+                    "message_text": "Paracetamol 500mg ዋጋ " * rng.randint(1, 20),
+                    "views": rng.randint(0, 50000),
+                    "forwards": rng.randint(0, 500),
+                    "has_media": rng.random() < 0.5,
+                    "image_path": None,
+                }, ensure_ascii=False) + "\n")
+    return message_id
+
+
+def reset_schema(schema):
+    conn = get_connection()
+    with conn, conn.cursor() as cursor:
+        cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+    conn.close()
+
+
+def main():
+    args = parse_args()
+    original_schema = db_conf["raw_schema"]
+    db_conf["raw_schema"] = args.schema
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="ingest-bench-") as folder:
+            total = write_raw_files(folder, args.messages, args.files)
+            for mode in args.modes:
+                reset_schema(args.schema)
+                started = time.perf_counter()
+                loader.load_json_files(
+                    mode=mode, folder=Path(folder), full_reload=True, workers=args.workers
+                )
+                elapsed = time.perf_counter() - started
+                print(f"{mode:>5}: {total} rows in {elapsed:.2f}s ({total / elapsed:,.0f} rows/sec)")
+    finally:
+        reset_schema(args.schema)
+        db_conf["raw_schema"] = original_schema
+
+
+if __name__ == "__main__":
+    main()
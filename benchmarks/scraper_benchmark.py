@@ -0,0 +1,153 @@
+"""
+Offline scraper throughput benchmark.
+
+Runs the real scrape_channel / extract_message_data path against
+FakeTelegramClient instances and reports messages/sec, bytes/sec, peak RSS
+and time spent throttled. Use it to catch regressions and to size
+concurrency settings before changing production config:
+
+    python -m benchmarks.scraper_benchmark --channels 8 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks.fake_telegram import FakeTelegramClient
+from src.scraping import telegram_client
+from src.scraping.metrics import reset_metrics
+from src.scraping.scrapper import scrape_channels_concurrently, scrape_channels_serially
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a fake Telegram")
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=1000, help="Messages per channel")
+    parser.add_argument("--sessions", type=int, default=1, help="Fake accounts in the client pool")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--serial", action="store_true")
+    parser.add_argument("--download-workers", type=int, default=4)
+    parser.add_argument("--page-latency", type=float, default=0.05)
+    parser.add_argument("--download-latency", type=float, default=0.02)
+    parser.add_argument("--photo-ratio", type=float, default=0.5)
+    parser.add_argument("--media-bytes", type=int, default=200_000)
+    parser.add_argument("--flood-every", type=int, default=0, help="Inject a FloodWait every N requests")
+    parser.add_argument("--flood-seconds", type=int, default=1)
+    parser.add_argument("--requests-per-second", type=float, default=1000.0)
+    parser.add_argument("--raw-format", choices=["ndjson", "parquet"], default="ndjson")
+    parser.add_argument("--raw-compression", choices=["gzip", "zstd"], default=None)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def build_config(args, workdir):
+    return {
+        "telegram": {
+            "channels": [
+                {"name": f"bench_{i}", "url": f"https://t.me/bench_{i}"}
+                for i in range(args.channels)
+            ],
+        },
+        "scraping": {
+            "fetch_limit": args.messages,
+            "download_images": True,
+            "download_workers": args.download_workers,
+            "requests_per_second": args.requests_per_second,
+            "request_burst": max(1, int(args.requests_per_second)),
+        },
+        "storage": {
+            "raw_data_path": f"{workdir}/raw/messages",
+            "image_path": f"{workdir}/raw/images",
+            "raw_format": args.raw_format,
+            "raw_compression": args.raw_compression,
+        },
+    }
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run(args, config):
+    fakes = [
+        FakeTelegramClient(
+            messages_per_channel=args.messages,
+            page_latency=args.page_latency,
+            download_latency=args.download_latency,
+            photo_ratio=args.photo_ratio,
+            media_bytes=args.media_bytes,
+            flood_wait_every=args.flood_every,
+            flood_wait_seconds=args.flood_seconds,
+            seed=index,
+        )
+        for index in range(args.sessions)
+    ]
+    fake_iter = iter(fakes)
+
+    # The pool builds its clients through get_telegram_client (single
+    # session) or from numbered credentials; swap both for the fakes.
+    credentials = [
+        {"api_id": i, "api_hash": "fake", "session_name": f"fake_{i}"}
+        for i in range(args.sessions)
+    ] if args.sessions > 1 else []
+    with mock.patch.object(telegram_client, "get_telegram_client", lambda: next(fake_iter)), \
+         mock.patch.object(telegram_client, "load_session_credentials", lambda: credentials), \
+         mock.patch.object(telegram_client, "TelegramClient", lambda *a: next(fake_iter)):
+        pool = telegram_client.TelegramClientPool.from_env(config)
+
+    channels = config["telegram"]["channels"]
+    metrics = reset_metrics()
+    started = time.perf_counter()
+    async with pool:
+        if args.serial:
+            results = await scrape_channels_serially(pool, channels, config)
+        else:
+            results = await scrape_channels_concurrently(pool, channels, config, args.concurrency)
+    elapsed = time.perf_counter() - started
+
+    failed = {name: repr(r) for name, r in results.items() if isinstance(r, BaseException)}
+    messages = sum(r for r in results.values() if not isinstance(r, BaseException))
+    bytes_downloaded = sum(fake.bytes_downloaded for fake in fakes)
+
+    return {
+        "channels": len(channels),
+        "sessions": args.sessions,
+        "concurrency": 1 if args.serial else args.concurrency,
+        "download_workers": args.download_workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "messages": messages,
+        "messages_per_second": round(messages / elapsed, 1),
+        "bytes_downloaded": bytes_downloaded,
+        "bytes_per_second": round(bytes_downloaded / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "requests": sum(fake.requests for fake in fakes),
+        "injected_flood_waits": sum(fake.flood_waits for fake in fakes),
+        "throttle": pool.stats.as_dict(),
+        "page_latency_mean": metrics.page_latency.as_dict()["mean"],
+        "download_latency_mean": metrics.download_latency.as_dict()["mean"],
+        "failed_channels": failed,
+    }
+
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="scraper-bench-") as workdir:
+        report = asyncio.run(run(args, build_config(args, workdir)))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for key, value in report.items():
+        print(f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Accuracy and speed of the YOLO backends against the PyTorch baseline.
+
+Runs each backend over a fixed sample of the scraped images and reports
+images/sec plus how far its detections drift from PyTorch's:
+
+    python -m benchmarks.yolo_accuracy --backends onnx onnx-int8 --sample 200
+
+The sample is chosen once (lowest image hashes) and saved to
+data/enriched/yolo_sample.txt so later runs compare on the same images
+even after new ones are scraped. Delete the file to draw a new sample.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from src import yolo_detect
+from src.detection_cache import image_sha256
+
+SAMPLE_FILE = Path(yolo_detect.ENRICHED_DIR) / "yolo_sample.txt"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare YOLO backends to PyTorch")
+    parser.add_argument("--backends", nargs="+", default=["onnx", "onnx-int8"])
+    parser.add_argument("--sample", type=int, default=200, help="Images in a new sample")
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime intra-op threads")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+
+def sample_images(size):
+    if SAMPLE_FILE.exists():
+        paths = SAMPLE_FILE.read_text(encoding="utf-8").split()
+        return [path for path in paths if os.path.exists(path)]
+
+    hashed = sorted(
+        (image_sha256(path), path) for path, _ in yolo_detect.iter_image_jobs()
+    )
+    paths = sorted({path for _, path in hashed[:size]})
+    SAMPLE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    SAMPLE_FILE.write_text("\n".join(paths) + "\n", encoding="utf-8")
+    return paths
+
+
+def run_backend(backend, paths, threads):
+    model = yolo_detect.load_model(backend, threads=threads)
+    jobs = ((path,) for path in paths)
+    results = {}
+
+    started = time.perf_counter()
+    for batch in yolo_detect.iter_decoded_batches(jobs):
+        detections = yolo_detect.detect_batch(model, [image for _, image in batch])
+        for (path, _), image_detections in zip(batch, detections):
+            results[path] = image_detections
+    elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def compare(baseline, candidate):
+    """
+    Match detections per image by class, pairing confidences in rank order.
+    """
+    matched = baseline_total = candidate_total = same_category = 0
+    confidence_deltas = []
+
+    for path, expected in baseline.items():
+        actual = candidate.get(path, [])
+        baseline_total += len(expected)
+        candidate_total += len(actual)
+
+        expected_counts = Counter(cls for cls, _ in expected)
+        actual_counts = Counter(cls for cls, _ in actual)
+        matched += sum((expected_counts & actual_counts).values())
+
+        for cls in expected_counts & actual_counts:
+            expected_conf = sorted((c for k, c in expected if k == cls), reverse=True)
+            actual_conf = sorted((c for k, c in actual if k == cls), reverse=True)
+            confidence_deltas.extend(abs(a - b) for a, b in zip(expected_conf, actual_conf))
+
+        same_category += yolo_detect.classify_image([cls for cls, _ in expected]) == \
+            yolo_detect.classify_image([cls for cls, _ in actual])
+
+    return {
+        "precision": matched / candidate_total if candidate_total else 1.0,
+        "recall": matched / baseline_total if baseline_total else 1.0,
+        "mean_confidence_delta": (
+            sum(confidence_deltas) / len(confidence_deltas) if confidence_deltas else 0.0
+        ),
+        "category_agreement": same_category / len(baseline) if baseline else 1.0,
+    }
+
+
+def main():
+    args = parse_args()
+    paths = sample_images(args.sample)
+    if not paths:
+        raise SystemExit(f"No images found under {yolo_detect.RAW_IMAGE_DIR}")
+
+    baseline, baseline_elapsed = run_backend("torch", paths, args.threads)
+    report = {
+        "images": len(paths),
+        "torch": {"images_per_sec": len(paths) / baseline_elapsed},
+    }
+    for backend in args.backends:
+        results, elapsed = run_backend(backend, paths, args.threads)
+        report[backend] = {"images_per_sec": len(paths) / elapsed, **compare(baseline, results)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"sample: {report['images']} images ({SAMPLE_FILE})")
+    for backend in ["torch", *args.backends]:
+        stats = report[backend]
+        line = f"{backend:>10}: {stats['images_per_sec']:8.1f} images/sec"
+        if backend != "torch":
+            line += (
+                f"  precision {stats['precision']:.3f}  recall {stats['recall']:.3f}"
+                f"  |dconf| {stats['mean_confidence_delta']:.4f}"
+                f"  category agreement {stats['category_agreement']:.3f}"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
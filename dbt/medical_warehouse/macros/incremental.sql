@@ -0,0 +1,10 @@
+-- macros/incremental.sql
+-- Watermarks for incremental models. loaded_at/processed_at are set by
+-- now(), i.e. when the writing transaction started, so a row can commit
+-- after a run that already recorded a later watermark. Re-reading a
+-- lookback window (var incremental_lookback) picks such rows up; the
+-- merge/delete+insert strategies make re-processing them harmless.
+
+{% macro incremental_watermark(column) -%}
+    (select coalesce(max({{ column }}), '-infinity') - interval '{{ var("incremental_lookback") }}' from {{ this }})
+{%- endmacro %}
@@ -0,0 +1,11 @@
+-- macros/surrogate_keys.sql
+-- Deterministic surrogate keys: the same input always gives the same key,
+-- so keys survive full rebuilds and incremental runs alike.
+
+{% macro channel_key(channel_name) -%}
+    ('x' || left(md5({{ channel_name }}), 15))::bit(60)::bigint
+{%- endmacro %}
+
+{% macro date_key(date_expr) -%}
+    to_char(({{ date_expr }})::date, 'YYYYMMDD')::int
+{%- endmacro %}
@@ -0,0 +1,43 @@
+-- models/marts/agg_channel_daily_activity.sql
+-- Serving rollup for the channel activity endpoint: one row per channel
+-- per day with posts. Incremental: only (channel, day) groups that gained
+-- or changed messages since the last run (less the lookback window) are
+-- recomputed and replaced.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['channel_key', 'date_key'],
+    indexes=[
+      {'columns': ['channel_name', 'date_key'], 'unique': True},
+      {'columns': ['channel_key', 'date_key'], 'unique': True}
+    ]
+) }}
+
+{% if is_incremental() %}
+with changed as (
+    select distinct channel_key, date_key
+    from {{ ref('fct_messages') }}
+    where loaded_at > {{ incremental_watermark('source_loaded_at') }}
+)
+{% endif %}
+
+select
+    m.channel_key,
+    c.channel_name,
+    m.date_key,
+    d.full_date,
+    count(*) as message_count,
+    sum(m.view_count) as total_views,
+    sum(m.forward_count) as total_forwards,
+    max(m.loaded_at) as source_loaded_at
+from {{ ref('fct_messages') }} m
+join {{ ref('dim_channels') }} c
+    on c.channel_key = m.channel_key
+join {{ ref('dim_dates') }} d
+    on d.date_key = m.date_key
+{% if is_incremental() %}
+join changed ch
+    on ch.channel_key = m.channel_key
+   and ch.date_key = m.date_key
+{% endif %}
+group by m.channel_key, c.channel_name, m.date_key, d.full_date
@@ -0,0 +1,41 @@
+-- models/marts/agg_channel_daily_image_categories.sql
+-- Serving rollup for the visual content endpoint: image counts per
+-- channel, day and image_category. Incremental: every category of a
+-- (channel, day) with new or re-enriched images (less the lookback window)
+-- is recomputed, so an image that changed category leaves no stale count
+-- behind.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['channel_key', 'date_key'],
+    indexes=[
+      {'columns': ['channel_name', 'date_key', 'image_category'], 'unique': True},
+      {'columns': ['channel_key', 'date_key']}
+    ]
+) }}
+
+{% if is_incremental() %}
+with changed as (
+    select distinct channel_key, date_key
+    from {{ ref('fct_image_detections') }}
+    where greatest(processed_at, message_loaded_at)
+          > {{ incremental_watermark('source_updated_at') }}
+)
+{% endif %}
+
+select
+    y.channel_key,
+    c.channel_name,
+    y.date_key,
+    y.image_category,
+    count(*) as image_count,
+    max(greatest(y.processed_at, y.message_loaded_at)) as source_updated_at
+from {{ ref('fct_image_detections') }} y
+join {{ ref('dim_channels') }} c
+    on c.channel_key = y.channel_key
+{% if is_incremental() %}
+join changed ch
+    on ch.channel_key = y.channel_key
+   and ch.date_key = y.date_key
+{% endif %}
+group by y.channel_key, c.channel_name, y.date_key, y.image_category
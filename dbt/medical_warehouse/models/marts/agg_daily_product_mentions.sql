@@ -0,0 +1,54 @@
+-- models/marts/agg_daily_product_mentions.sql
+-- Serving rollup for the top-products endpoint: mentions per product,
+-- channel and day. Incremental: (channel, day) groups with messages
+-- (re)loaded since the last run, less the lookback window, are cleared by
+-- the pre-hook and recomputed, so a day whose mentions were all edited
+-- away keeps no stale counts.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['channel_key', 'date_key'],
+    pre_hook="
+        {% if is_incremental() %}
+        delete from {{ this }} t
+        using (
+            select distinct channel_key, date_key
+            from {{ ref('fct_messages') }}
+            where loaded_at > {{ incremental_watermark('source_loaded_at') }}
+        ) ch
+        where t.channel_key = ch.channel_key
+          and t.date_key = ch.date_key
+        {% endif %}
+    ",
+    indexes=[
+      {'columns': ['date_key', 'product_name']},
+      {'columns': ['channel_name', 'date_key']},
+      {'columns': ['channel_key', 'date_key']}
+    ]
+) }}
+
+{% if is_incremental() %}
+with changed as (
+    select distinct channel_key, date_key
+    from {{ ref('fct_messages') }}
+    where loaded_at > {{ incremental_watermark('source_loaded_at') }}
+)
+{% endif %}
+
+select
+    p.product_name,
+    p.channel_key,
+    c.channel_name,
+    p.date_key,
+    sum(p.mention_count) as mention_count,
+    count(*) as message_count,
+    max(p.loaded_at) as source_loaded_at
+from {{ ref('fct_message_product_mentions') }} p
+join {{ ref('dim_channels') }} c
+    on c.channel_key = p.channel_key
+{% if is_incremental() %}
+join changed ch
+    on ch.channel_key = p.channel_key
+   and ch.date_key = p.date_key
+{% endif %}
+group by p.product_name, p.channel_key, c.channel_name, p.date_key
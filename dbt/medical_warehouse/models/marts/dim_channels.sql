@@ -3,7 +3,7 @@
 
 with channels as (
     select
-        dense_rank() over (order by channel_name) as channel_key,  -- surrogate key
+        {{ channel_key('channel_name') }} as channel_key,  -- surrogate key (hash of name)
         channel_name,
         case
             when channel_name = 'chemed' then 'Medical'
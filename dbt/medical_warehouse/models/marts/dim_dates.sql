@@ -1,15 +1,28 @@
 -- models/marts/dim_dates.sql
-{{ config(materialized='table') }}
+-- Calendar spine from var('date_spine_start') to var('date_spine_days_ahead')
+-- days past today, including days without posts. Built once, then each
+-- run only appends the days past the current end. Moving the start
+-- earlier needs a --full-refresh.
+{{ config(
+    materialized='incremental',
+    unique_key='date_key'
+) }}
 
-with dates as (
-    select
-        post_date::date as full_date
-    from {{ ref('stg_telegram_messages') }}
+with spine as (
+    select generate_series(
+        {% if is_incremental() %}
+        (select max(full_date) + 1 from {{ this }}),
+        {% else %}
+        '{{ var("date_spine_start") }}'::date,
+        {% endif %}
+        current_date + {{ var('date_spine_days_ahead') }},
+        interval '1 day'
+    )::date as full_date
 ),
 
 dim as (
     select
-        row_number() over (order by full_date) as date_key,
+        {{ date_key('full_date') }} as date_key,  -- yyyymmdd
         full_date,
         extract(dow from full_date)::int as day_of_week,
         to_char(full_date, 'Day') as day_name,
@@ -19,8 +32,7 @@ dim as (
         extract(quarter from full_date)::int as quarter,
         extract(year from full_date)::int as year,
         case when extract(dow from full_date) in (0,6) then true else false end as is_weekend
-    from dates
-    group by full_date
+    from spine
 )
 
 select * from dim
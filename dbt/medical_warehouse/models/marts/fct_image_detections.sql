@@ -1,44 +1,33 @@
 -- dbt/medical_warehouse/models/marts/fct_image_detections.sql
-
-with yolo_clean as (
-    select
-        -- normalize message_id to match fct_messages
-        regexp_replace(message_id, '^[^0-9]*', '')::int as message_id_clean,
-        detected_class,
-        confidence_score,
-        case
-            when image_category is null or image_category = '' then 'other'
-            else image_category
-        end as image_category
-    from {{ ref('stg_yolo_detections') }}
-),
-
-yolo_agg as (
-    select
-        message_id_clean as message_id,
-        string_agg(distinct detected_class, ', ') as detected_class,
-        max(confidence_score) as confidence_score,
-        -- classify images based on detected classes
-        case
-            when 'person' = any(array_agg(distinct detected_class)) 
-                 and ('bottle' = any(array_agg(distinct detected_class))
-                      or 'product' = any(array_agg(distinct detected_class))) then 'promotional'
-            when 'person' = any(array_agg(distinct detected_class)) then 'lifestyle'
-            when 'bottle' = any(array_agg(distinct detected_class))
-                 or 'product' = any(array_agg(distinct detected_class)) then 'product_display'
-            else 'other'
-        end as image_category
-    from yolo_clean
-    group by message_id_clean
-)
+-- One row per message image; category and detected classes are
+-- precomputed per image by the enrichment stage. Incremental: picks up
+-- images enriched since the last run and images whose message arrived late
+-- (with the same lookback window as fct_messages).
+{{ config(
+    materialized='incremental',
+    incremental_strategy='merge',
+    unique_key=['channel_key', 'message_id'],
+    indexes=[
+      {'columns': ['channel_key', 'message_id'], 'unique': True},
+      {'columns': ['image_category']}
+    ]
+) }}
 
 select
     y.message_id,
     m.channel_key,
     m.date_key,
-    y.detected_class,
-    y.confidence_score,
-    y.image_category
-from yolo_agg y
-left join {{ ref('fct_messages') }} m
-    on y.message_id::text = m.message_id
+    y.detected_classes as detected_class,
+    y.max_confidence as confidence_score,
+    y.object_count,
+    y.image_category,
+    y.processed_at,
+    m.loaded_at as message_loaded_at
+from {{ ref('stg_yolo_image_summary') }} y
+join {{ ref('fct_messages') }} m
+    on m.channel_key = {{ channel_key('y.channel_name') }}
+   and m.message_id = y.message_id
+{% if is_incremental() %}
+where y.processed_at > {{ incremental_watermark('processed_at') }}
+   or m.loaded_at > {{ incremental_watermark('message_loaded_at') }}
+{% endif %}
@@ -0,0 +1,41 @@
+-- models/marts/fct_message_product_mentions.sql
+-- One row per product mentioned in a message. Incremental: messages
+-- (re)loaded since the last run, less the lookback window, have all their
+-- mention rows replaced. The pre-hook clears those messages first, so a
+-- message whose edited text no longer mentions any product loses its rows
+-- too (delete+insert alone only replaces keys the new rows carry).
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key=['channel_key', 'message_id'],
+    pre_hook="
+        {% if is_incremental() %}
+        delete from {{ this }} t
+        using {{ ref('stg_telegram_messages') }} m
+        where t.channel_key = {{ channel_key('m.channel_name') }}
+          and t.message_id = m.message_id
+          and m.loaded_at > {{ incremental_watermark('loaded_at') }}
+        {% endif %}
+    ",
+    indexes=[
+      {'columns': ['channel_key', 'message_id', 'product_name'], 'unique': True},
+      {'columns': ['product_name', 'date_key']}
+    ]
+) }}
+
+select
+    p.message_id,
+    {{ channel_key('p.channel_name') }} as channel_key,
+    d.date_key,
+    p.product_name,
+    p.mention_count,
+    m.loaded_at
+from {{ ref('stg_message_product_mentions') }} p
+join {{ ref('stg_telegram_messages') }} m
+    on m.channel_name = p.channel_name
+   and m.message_id = p.message_id
+join {{ ref('dim_dates') }} d
+    on d.date_key = {{ date_key('p.post_date') }}
+{% if is_incremental() %}
+where m.loaded_at > {{ incremental_watermark('loaded_at') }}
+{% endif %}
@@ -1,17 +1,30 @@
 -- models/marts/fct_messages.sql
-{{ config(materialized='table') }}
+-- Incremental: each run merges only rows inserted or updated in raw since
+-- the last run (new messages and late view/forward count changes), less a
+-- lookback window for loads that committed late.
+{{ config(
+    materialized='incremental',
+    incremental_strategy='merge',
+    unique_key=['channel_key', 'message_id'],
+    indexes=[
+      {'columns': ['channel_key', 'message_id'], 'unique': True},
+      {'columns': ['date_key']}
+    ]
+) }}
 
 select
     m.message_id,
-    c.channel_key,
+    {{ channel_key('m.channel_name') }} as channel_key,
     d.date_key,
     m.message_text,
     m.message_length,
     m.view_count,
     m.forward_count,
-    m.has_image
+    m.has_image,
+    m.loaded_at
 from {{ ref('stg_telegram_messages') }} m
-join {{ ref('dim_channels') }} c
-    on m.channel_name = c.channel_name
 join {{ ref('dim_dates') }} d
-    on m.post_date::date = d.full_date
+    on d.date_key = {{ date_key('m.post_date') }}
+{% if is_incremental() %}
+where m.loaded_at > {{ incremental_watermark('loaded_at') }}
+{% endif %}
@@ -0,0 +1,10 @@
+-- dbt/medical_warehouse/models/staging/stg_message_product_mentions.sql
+
+select
+    channel_name,
+    message_id,
+    post_date,
+    product_name,
+    mention_count,
+    loaded_at
+from {{ source('raw', 'message_product_mentions') }}
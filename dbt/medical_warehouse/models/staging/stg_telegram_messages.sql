@@ -14,7 +14,7 @@ with raw as (
 cleaned as (
 
     select
-        message_id,
+        message_id::bigint as message_id,
         channel_name,
         post_date::timestamp as post_date,
         message_text,
@@ -25,7 +25,8 @@ cleaned as (
             else has_image
         end as has_image,
         length(message_text) as message_length,
-        raw_json
+        raw_json,
+        loaded_at
     from raw
     where message_id is not null
       and post_date is not null
@@ -0,0 +1,12 @@
+-- dbt/medical_warehouse/models/staging/stg_yolo_image_summary.sql
+
+select
+    channel_name,
+    message_id,
+    image_path,
+    image_category,
+    coalesce(detected_classes, 'none') as detected_classes,
+    object_count,
+    coalesce(max_confidence, 0.0) as max_confidence,
+    processed_at
+from {{ source('raw', 'yolo_image_summary') }}
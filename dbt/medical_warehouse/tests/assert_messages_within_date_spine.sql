@@ -0,0 +1,8 @@
+-- dbt/medical_warehouse/tests/assert_messages_within_date_spine.sql
+-- Ensures every message has a dim_dates row; fct_messages inner-joins
+-- dim_dates, so messages outside the spine would be dropped silently.
+-- If this fails, move date_spine_start earlier (or date_spine_days_ahead up).
+select *
+from {{ ref('stg_telegram_messages') }}
+where post_date::date < '{{ var("date_spine_start") }}'::date
+   or post_date::date > current_date + {{ var("date_spine_days_ahead") }}
@@ -0,0 +1,6 @@
+-- dbt/medical_warehouse/tests/assert_unique_image_detections.sql
+-- Ensures each message image appears once in fct_image_detections
+select channel_key, message_id, count(*)
+from {{ ref('fct_image_detections') }}
+group by channel_key, message_id
+having count(*) > 1
@@ -0,0 +1,6 @@
+-- dbt/medical_warehouse/tests/assert_unique_messages.sql
+-- Ensures each (channel, message) appears once in fct_messages
+select channel_key, message_id, count(*)
+from {{ ref('fct_messages') }}
+group by channel_key, message_id
+having count(*) > 1
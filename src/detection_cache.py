@@ -0,0 +1,90 @@
+import json
+import logging
+import sqlite3
+from pathlib import Path
+
+from src.scraping.image_store import file_sha256
+
+
+def model_version(weights_path, image_size, backend="torch"):
+    """
+    Identifies a model by its weights file name, a hash of the weights, the
+    input size and the inference backend, so swapping, retraining or
+    quantizing the model changes the key.
+    """
+    weights_path = Path(weights_path)
+    digest = file_sha256(weights_path)[:16] if weights_path.exists() else "unknown"
+    key = f"{weights_path.name}:{digest}:{image_size}"
+    return key if backend == "torch" else f"{key}:{backend}"
+
+
+def image_sha256(image_path):
+    """
+    Content hash of an image. Files in the content-addressed store are named
+    by their hash, so only loose per-channel files have to be read.
+    """
+    path = Path(image_path)
+    if path.parent.parent.name == "objects" and len(path.stem) == 64:
+        return path.stem
+    return file_sha256(path)
+
+
+class DetectionCache:
+    """
+    Persistent YOLO results keyed on (image sha256, model version).
+
+    Entries written by any other model version are dropped when the cache is
+    opened, so swapping the weights re-runs detection on every image once.
+    """
+
+    def __init__(self, path, model_key):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.model_key = model_key
+
+        # sharded YOLO workers share the file; wait on their write locks
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS detections (
+                sha256 TEXT NOT NULL,
+                model_key TEXT NOT NULL,
+                detections TEXT NOT NULL,
+                PRIMARY KEY (sha256, model_key)
+            );
+        """)
+        stale = self.conn.execute(
+            "DELETE FROM detections WHERE model_key != ?", (model_key,)
+        ).rowcount
+        self.conn.commit()
+        if stale:
+            logging.info(f"Invalidated {stale} cached detections from a previous model")
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sha256):
+        """
+        Returns the cached [(class, confidence), ...] for an image, or None.
+        """
+        row = self.conn.execute(
+            "SELECT detections FROM detections WHERE sha256 = ? AND model_key = ?",
+            (sha256, self.model_key),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return [(cls, conf) for cls, conf in json.loads(row[0])]
+
+    def put_many(self, entries):
+        """
+        Stores [(sha256, detections), ...] in a single transaction.
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO detections (sha256, model_key, detections) VALUES (?, ?, ?)",
+            [(sha256, self.model_key, json.dumps(detections)) for sha256, detections in entries],
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,188 @@
+"""
+Streaming YOLO Enrichment Worker
+
+Long-lived counterpart to yolo_detect.main(): instead of walking the whole
+image tree after the pipeline, it consumes the enrichment queue the scraper
+fills as photos are downloaded (enrichment.streaming in the scraping
+config) and writes detections to Postgres micro-batch by micro-batch.
+
+A micro-batch is dispatched when it is full (YOLO_BATCH_SIZE) or when its
+oldest job has waited YOLO_STREAM_MAX_WAIT seconds. Jobs are only marked
+done after their detections are committed; a crashed worker's claims are
+released on restart (same worker id) or when their lease expires.
+
+Usage:
+    python -m src.enrichment_worker [--queue PATH] [--drain]
+"""
+
+import os
+import time
+import signal
+import socket
+import argparse
+import logging
+import contextlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from src import yolo_detect
+from src.detection_cache import DetectionCache, image_sha256
+from src.scraping.enrichment_queue import EnrichmentQueue
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+QUEUE_PATH = os.getenv("ENRICHMENT_QUEUE_PATH", "data/state/enrichment_queue.sqlite")
+WORKER_ID = os.getenv("ENRICHMENT_WORKER_ID", socket.gethostname())  # stable across restarts
+MAX_BATCH_WAIT = float(os.getenv("YOLO_STREAM_MAX_WAIT", "2.0"))  # seconds
+POLL_INTERVAL = 1.0
+
+
+class Worker:
+    """Owns the model, cache and loader for the life of the process."""
+
+    def __init__(self, queue: EnrichmentQueue, worker_id: str = WORKER_ID):
+        if yolo_detect.OUTPUT_FORMAT != "postgres":
+            raise ValueError("Streaming enrichment writes to Postgres (YOLO_OUTPUT_FORMAT=postgres)")
+
+        self.queue = queue
+        self.worker_id = worker_id
+        self.model = yolo_detect.load_model()
+        self.cache = DetectionCache(yolo_detect.DETECTION_CACHE, yolo_detect.current_model_key())
+        self._stack = contextlib.ExitStack()
+        self.loader = self._stack.enter_context(yolo_detect.postgres_loader())
+        self.emit = yolo_detect.loader_emitter(self.loader)
+        self.stopping = False
+        self.processed = 0
+
+    def collect_batch(self) -> List[tuple]:
+        """
+        Claim jobs until the micro-batch is full or its first job has
+        waited MAX_BATCH_WAIT seconds.
+        """
+        jobs: List[tuple] = []
+        first_claimed = None
+        while len(jobs) < yolo_detect.BATCH_SIZE and not self.stopping:
+            claimed = self.queue.claim(yolo_detect.BATCH_SIZE - len(jobs), self.worker_id)
+            if claimed and first_claimed is None:
+                first_claimed = time.monotonic()
+            jobs.extend(claimed)
+
+            if first_claimed is not None and time.monotonic() - first_claimed >= MAX_BATCH_WAIT:
+                break
+            if not claimed:
+                if not jobs:
+                    return jobs
+                time.sleep(min(POLL_INTERVAL, MAX_BATCH_WAIT))
+        return jobs
+
+    def process(self, jobs: List[tuple]) -> None:
+        """Detect, write and acknowledge one micro-batch of queue jobs."""
+        # several messages can share one deduplicated image
+        images: Dict[str, Tuple[list, list]] = OrderedDict()
+        for job_id, channel_name, message_id, image_path in jobs:
+            refs, ids = images.setdefault(image_path, ([], []))
+            refs.append((channel_name, str(message_id)))
+            ids.append(job_id)
+
+        done: List[int] = []
+        pending = []
+        for image_path, (refs, ids) in images.items():
+            try:
+                sha256 = image_sha256(image_path)
+            except OSError as e:
+                self.queue.fail(ids, e)
+                continue
+
+            detections = self.cache.get(sha256)
+            if detections is None:
+                pending.append((image_path, refs, sha256, ids))
+            else:
+                self.emit(image_path, refs, detections)
+                done.extend(ids)
+
+        decoded = [
+            item
+            for batch in yolo_detect.iter_decoded_batches(pending, batch_size=max(1, len(pending)))
+            for item in batch
+        ]
+        decoded_paths = {image_path for image_path, *_ in decoded}
+        for image_path, _, _, ids in pending:
+            if image_path not in decoded_paths:
+                self.queue.fail(ids, "could not decode image")
+
+        if decoded:
+            try:
+                batch_detections = yolo_detect.detect_batch(self.model, [image for *_, image in decoded])
+            except Exception as e:
+                logger.exception(f"YOLO failed on a micro-batch of {len(decoded)} images")
+                self.queue.fail([i for *_, ids, _ in decoded for i in ids], e)
+                batch_detections = []
+
+            fresh = []
+            for (image_path, refs, sha256, ids, _), detections in zip(decoded, batch_detections):
+                self.emit(image_path, refs, detections)
+                fresh.append((sha256, detections))
+                done.extend(ids)
+            self.cache.put_many(fresh)
+
+        # commit detections before acknowledging, so a crash in between
+        # only means the batch is detected (idempotently) again
+        self.loader.flush()
+        self.queue.complete(done)
+        self.processed += len(done)
+
+    def run(self, drain: bool = False) -> None:
+        self.queue.release_claims(self.worker_id)
+        logger.info(f"Enrichment worker {self.worker_id} started ({self.queue.depth()} jobs queued)")
+
+        while not self.stopping:
+            jobs = self.collect_batch()
+            if jobs:
+                started = time.perf_counter()
+                self.process(jobs)
+                logger.info(
+                    f"Enriched {len(jobs)} images in {time.perf_counter() - started:.2f}s "
+                    f"({self.queue.depth()} queued)"
+                )
+            elif drain:
+                break
+            else:
+                time.sleep(POLL_INTERVAL)
+
+        logger.info(f"Enrichment worker {self.worker_id} stopped after {self.processed} messages")
+
+    def stop(self, *_) -> None:
+        """Finish the current micro-batch, then exit."""
+        self.stopping = True
+
+    def close(self) -> None:
+        self._stack.close()
+        self.cache.close()
+        self.queue.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run YOLO detection on queued images as they arrive")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="Enrichment queue database")
+    parser.add_argument("--worker-id", default=WORKER_ID, help="Lease owner name (keep stable across restarts)")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    return parser.parse_args()
+
+
+def main(queue_path: str = QUEUE_PATH, worker_id: str = WORKER_ID, drain: bool = False) -> None:
+    worker = Worker(EnrichmentQueue(queue_path), worker_id)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    try:
+        worker.run(drain=drain)
+    finally:
+        worker.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    args = parse_args()
+    main(args.queue, args.worker_id, args.drain)
@@ -1,8 +1,11 @@
 # src/ingestion/db.py
 
+import os
 import psycopg2
+import psycopg2.pool
 import yaml
 import logging
+from contextlib import contextmanager
 from pathlib import Path
 
 # Configure logger
@@ -17,35 +20,77 @@ with open(CONFIG_FILE) as f:
 
 db_conf = config["postgres"]
 
+# Connection pool, created lazily and once per process (a pool inherited
+# through fork would share sockets with the parent)
+_pool = None
+_pool_pid = None
+
+def connection_params():
+    return dict(
+        host=db_conf["host"],
+        port=db_conf["port"],
+        user=db_conf["user"],
+        password=db_conf["password"],
+        dbname=db_conf["database"]
+    )
+
 def get_connection():
     """
     Returns a psycopg2 connection to PostgreSQL
     """
     try:
-        conn = psycopg2.connect(
-            host=db_conf["host"],
-            port=db_conf["port"],
-            user=db_conf["user"],
-            password=db_conf["password"],
-            dbname=db_conf["database"]
-        )
+        conn = psycopg2.connect(**connection_params())
         return conn
     except Exception as e:
         logger.error(f"Error connecting to PostgreSQL: {e}")
         raise
 
+def get_pool(maxconn=None):
+    """
+    Returns this process's thread-safe connection pool, creating it on first use
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        maxconn = maxconn or db_conf.get("pool_max_connections", 8)
+        try:
+            _pool = psycopg2.pool.ThreadedConnectionPool(1, maxconn, **connection_params())
+            _pool_pid = os.getpid()
+        except Exception as e:
+            logger.error(f"Error creating PostgreSQL connection pool: {e}")
+            raise
+    return _pool
+
+@contextmanager
+def pooled_connection():
+    """
+    Borrow a connection from the pool; rolled back on error and always
+    returned to the pool
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+def close_pool():
+    global _pool
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.closeall()
+    _pool = None
+
 def create_raw_schema():
     """
     Create raw schema if it doesn't exist
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {db_conf['raw_schema']};")
-        conn.commit()
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {db_conf['raw_schema']};")
+            conn.commit()
         logger.info(f"Schema '{db_conf['raw_schema']}' ensured in database.")
-        cursor.close()
-        conn.close()
     except Exception as e:
         logger.error(f"Error creating schema: {e}")
         raise
@@ -1,96 +1,615 @@
 # src/ingestion/load_telegram_messages.py
 
+import argparse
+import gzip
+import hashlib
+import io
 import json
 from pathlib import Path
 import logging
-from src.ingestion.db import get_connection, create_raw_schema, db_conf
+from concurrent.futures import ProcessPoolExecutor
+import psycopg2
+from src.ingestion.db import pooled_connection, close_pool, create_raw_schema, db_conf
+from src.ingestion.parquet_landing import iter_parquet_messages
+from src.ingestion.product_matcher import ProductMatcher
+from src.ingestion.partitions import (
+    create_partitioned_table,
+    ensure_future_partitions,
+    ensure_partitions,
+    is_legacy_table,
+    migrate_legacy_table,
+    month_start,
+)
 
 # Configure logger
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
+try:
+    import zstandard
+except ImportError:  # only needed for .ndjson.zst files
+    zstandard = None
+
 # Path to JSON files (search recursively in case of date folders)
 MESSAGES_FOLDER = Path(__file__).parent.parent.parent / "data" / "raw" / "messages"
 
+# Messages handed to the database writer at a time; bounds loader memory
+DEFAULT_BATCH_SIZE = 5000
+# Characters read per step when incrementally decoding a JSON array
+JSON_READ_CHUNK = 64 * 1024
+
+# Raw file layouts: legacy JSON arrays, (optionally compressed) NDJSON and Parquet
+RAW_FILE_PATTERNS = ("*.json", "*.ndjson", "*.ndjson.gz", "*.ndjson.zst", "*.parquet")
+
+RAW_COLUMNS = (
+    "message_id", "channel_name", "post_date", "message_text",
+    "view_count", "forward_count", "has_image", "raw_json",
+)
+
+RAW_KEY = ("channel_name", "message_id", "post_date")
+
+MENTION_COLUMNS = ("channel_name", "message_id", "post_date", "product_name", "mention_count")
+
+# Errors caused by a message's own values (bad types, constraint
+# violations); anything else, e.g. a lost connection, is not retried per row
+ROW_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError)
+
+# Dictionary matcher, built once per process on first use
+_product_matcher = None
+
+# Refreshed on conflict so re-scraped messages update their counts and
+# edited text (which their product mentions are rebuilt from); loaded_at
+# lets incremental dbt models find the updated rows
+UPSERT_CLAUSE = f"""
+    ON CONFLICT ({", ".join(RAW_KEY)}) DO UPDATE SET
+        message_text = EXCLUDED.message_text,
+        view_count = EXCLUDED.view_count,
+        forward_count = EXCLUDED.forward_count,
+        raw_json = EXCLUDED.raw_json,
+        loaded_at = now()
+"""
+
 def create_raw_table():
     """
-    Create the raw.telegram_messages table if it doesn't exist
+    Create the raw.telegram_messages table (partitioned by month of
+    post_date) if it doesn't exist, migrating a legacy unpartitioned table,
+    and pre-create partitions for the coming months
     """
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS {db_conf['raw_schema']}.telegram_messages (
-                message_id TEXT PRIMARY KEY,
-                channel_name TEXT,
-                post_date TIMESTAMP,
-                message_text TEXT,
-                view_count INTEGER,
-                forward_count INTEGER,
-                has_image BOOLEAN,
-                raw_json JSONB
-            );
-        """)
-        conn.commit()
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            if is_legacy_table(cursor):
+                migrate_legacy_table(cursor)
+            else:
+                create_partitioned_table(cursor)
+            conn.commit()
+        ensure_future_partitions()
         logger.info("Table 'raw.telegram_messages' ensured in database.")
-        cursor.close()
-        conn.close()
     except Exception as e:
         logger.error(f"Error creating table: {e}")
         raise
 
-def load_json_files():
+def create_manifest_table():
+    """
+    Create the raw.ingestion_manifest table that records which raw files
+    have been loaded, so unchanged files can be skipped
+    """
+    try:
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {db_conf['raw_schema']}.ingestion_manifest (
+                    file_path TEXT PRIMARY KEY,
+                    file_size BIGINT,
+                    file_mtime DOUBLE PRECISION,
+                    checksum TEXT,
+                    status TEXT,
+                    row_count INTEGER,
+                    error TEXT,
+                    loaded_at TIMESTAMP DEFAULT now()
+                );
+            """)
+            conn.commit()
+        logger.info("Table 'raw.ingestion_manifest' ensured in database.")
+    except Exception as e:
+        logger.error(f"Error creating manifest table: {e}")
+        raise
+
+def create_mentions_table():
+    """
+    Create the raw.message_product_mentions table: one row per product
+    mentioned in a message, filled at load time by the dictionary matcher
+    """
+    schema = db_conf["raw_schema"]
+    try:
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {schema}.message_product_mentions (
+                    channel_name TEXT NOT NULL,
+                    message_id BIGINT NOT NULL,
+                    post_date TIMESTAMP NOT NULL,
+                    product_name TEXT NOT NULL,
+                    mention_count INTEGER NOT NULL,
+                    loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+                    PRIMARY KEY (channel_name, message_id, product_name)
+                );
+                CREATE INDEX IF NOT EXISTS message_product_mentions_loaded_at_idx
+                    ON {schema}.message_product_mentions (loaded_at);
+            """)
+            conn.commit()
+        logger.info("Table 'raw.message_product_mentions' ensured in database.")
+    except Exception as e:
+        logger.error(f"Error creating product mentions table: {e}")
+        raise
+
+def get_product_matcher():
+    global _product_matcher
+    if _product_matcher is None:
+        _product_matcher = ProductMatcher.from_file()
+    return _product_matcher
+
+def fetch_manifest():
+    """
+    Return {file_path: (file_size, file_mtime, checksum, status)}
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT file_path, file_size, file_mtime, checksum, status
+            FROM {db_conf['raw_schema']}.ingestion_manifest;
+        """)
+        return {row[0]: row[1:] for row in cursor.fetchall()}
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def manifest_entry(json_file, folder, manifest):
+    """
+    Decide whether a file needs loading. Returns None for an unchanged,
+    already loaded file, otherwise the manifest entry to record.
+
+    Size and mtime are compared first; the checksum is only computed when
+    they differ, so a touched but identical file is still skipped.
+    """
+    stat = json_file.stat()
+    entry = {
+        "file_path": str(json_file.relative_to(folder)),
+        "file_size": stat.st_size,
+        "file_mtime": stat.st_mtime,
+        "checksum": None,
+    }
+
+    previous = manifest.get(entry["file_path"])
+    if previous:
+        size, mtime, checksum, status = previous
+        if status == "loaded" and size == stat.st_size:
+            if mtime == stat.st_mtime:
+                return None
+            entry["checksum"] = file_checksum(json_file)
+            if entry["checksum"] == checksum:
+                return None
+
+    if entry["checksum"] is None:
+        entry["checksum"] = file_checksum(json_file)
+    return entry
+
+def record_manifest(cursor, entry, status, row_count=None, error=None):
+    cursor.execute(f"""
+        INSERT INTO {db_conf['raw_schema']}.ingestion_manifest
+        (file_path, file_size, file_mtime, checksum, status, row_count, error, loaded_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, now())
+        ON CONFLICT (file_path) DO UPDATE SET
+            file_size = EXCLUDED.file_size,
+            file_mtime = EXCLUDED.file_mtime,
+            checksum = EXCLUDED.checksum,
+            status = EXCLUDED.status,
+            row_count = EXCLUDED.row_count,
+            error = EXCLUDED.error,
+            loaded_at = EXCLUDED.loaded_at;
+    """, (
+        entry["file_path"], entry["file_size"], entry["file_mtime"],
+        entry["checksum"], status, row_count, error,
+    ))
+
+def record_failure(entry, error):
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        record_manifest(cursor, entry, "failed", error=str(error))
+        conn.commit()
+
+def find_raw_files(folder=MESSAGES_FOLDER):
+    """
+    Return every raw message file under folder, in a stable order.
+    Files starting with "_" (e.g. scraper run summaries) are not data.
+    """
+    files = set()
+    for pattern in RAW_FILE_PATTERNS:
+        files.update(f for f in folder.rglob(pattern) if not f.name.startswith("_"))
+    return sorted(files)
+
+def open_raw_file(path):
+    """
+    Open a raw file as text, decompressing gzip/zstd by extension
+    """
+    if path.name.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path.name} requires the 'zstandard' package")
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+def iter_json_array(f):
+    """
+    Yield the elements of a top-level JSON array one at a time, reading the
+    file in fixed-size chunks instead of loading it whole
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace, the opening bracket and separators
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and not started:
+                if buffer[pos] != "[":
+                    raise json.JSONDecodeError("Expected a JSON array", buffer, pos)
+                started = True
+                pos += 1
+                continue
+            if pos < len(buffer) or eof:
+                break
+            chunk = f.read(JSON_READ_CHUNK)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        if pos >= len(buffer):
+            # EOF before the closing bracket: the array was truncated
+            message = "Unterminated JSON array" if started else "Expected a JSON array"
+            raise json.JSONDecodeError(message, buffer, pos)
+        if buffer[pos] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+            # A value not followed by a separator may be cut short (e.g. "7." of "7.5")
+            complete = eof or (end < len(buffer) and buffer[end] in " \t\r\n,]")
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+
+        if complete:
+            yield item
+            pos = end
+        else:
+            chunk = f.read(JSON_READ_CHUNK)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+def iter_message_batches(path, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yield a raw file's messages in lists of at most batch_size, so peak
+    memory stays flat regardless of file size. Handles JSON-array, NDJSON
+    (plain, gzip or zstd) and Parquet files.
+    """
+    if path.suffix == ".parquet":
+        yield from iter_parquet_messages(path, batch_size)
+        return
+
+    with open_raw_file(path) as f:
+        if path.name.endswith(".json"):
+            messages = iter_json_array(f)
+        else:
+            messages = (json.loads(line) for line in f if line.strip())
+
+        batch = []
+        for msg in messages:
+            batch.append(msg)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+def message_row(msg):
+    """
+    Map a raw message dict onto the raw.telegram_messages columns
+    """
+    return (
+        str(msg.get("message_id")),
+        msg.get("channel_name"),
+        msg.get("message_date"),
+        msg.get("message_text"),
+        msg.get("views", 0),
+        msg.get("forwards", 0),
+        bool(msg.get("has_media")),
+        json.dumps(msg, ensure_ascii=False),
+    )
+
+def csv_field(value):
+    """
+    Render one value for COPY ... (FORMAT csv): strings are always quoted,
+    so an unquoted empty field (None) is the only thing read as NULL
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+class CsvRowStream(io.TextIOBase):
     """
-    Read all JSON files in data/raw/messages/ (including subfolders)
-    and insert into PostgreSQL
+    File-like object that renders rows as CSV lazily, so COPY can stream
+    them without the whole payload being built in memory first
+    """
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._pending = ""
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._pending += ",".join(csv_field(value) for value in row) + "\n"
+
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+def insert_messages_rowwise(cursor, messages):
+    """
+    Fallback path: one INSERT ... ON CONFLICT round-trip per message, each
+    under a savepoint so a bad row is skipped without aborting the
+    transaction. Returns the messages written.
+    """
+    written = []
+    for msg in messages:
+        cursor.execute("SAVEPOINT message_row")
+        try:
+            cursor.execute(f"""
+                INSERT INTO {db_conf['raw_schema']}.telegram_messages
+                ({", ".join(RAW_COLUMNS)})
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                {UPSERT_CLAUSE};
+            """, message_row(msg))
+        except ROW_ERRORS as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT message_row")
+            logger.error(f"Error inserting message {msg.get('message_id')}: {e}")
+            continue
+        cursor.execute("RELEASE SAVEPOINT message_row")
+        written.append(msg)
+    return written
+
+def copy_messages(cursor, messages):
+    """
+    Bulk path: stream messages into a temp staging table with
+    COPY FROM STDIN, then merge into raw.telegram_messages with a single
+    set-based upsert. Returns the number of rows merged.
+    """
+    columns = ", ".join(RAW_COLUMNS)
+    cursor.execute(f"""
+        CREATE TEMP TABLE IF NOT EXISTS staging_telegram_messages
+        (LIKE {db_conf['raw_schema']}.telegram_messages INCLUDING DEFAULTS);
+        TRUNCATE staging_telegram_messages;
+    """)
+    cursor.copy_expert(
+        f"COPY staging_telegram_messages ({columns}) FROM STDIN WITH (FORMAT csv)",
+        CsvRowStream(message_row(msg) for msg in messages),
+    )
+    # DISTINCT ON: a batch may repeat a message, which ON CONFLICT rejects
+    cursor.execute(f"""
+        INSERT INTO {db_conf['raw_schema']}.telegram_messages ({columns})
+        SELECT DISTINCT ON ({", ".join(RAW_KEY)}) {columns}
+        FROM staging_telegram_messages
+        ORDER BY {", ".join(RAW_KEY)}
+        {UPSERT_CLAUSE};
+    """)
+    return cursor.rowcount
+
+def mention_rows(messages):
+    """
+    Yield raw.message_product_mentions rows for the dictionary products
+    each message mentions
+    """
+    matcher = get_product_matcher()
+    for msg in messages:
+        counts = matcher.count(msg.get("message_text"))
+        for product_name, mention_count in sorted(counts.items()):
+            yield (
+                msg["channel_name"], int(msg["message_id"]), msg["message_date"],
+                product_name, mention_count,
+            )
+
+def copy_mentions(cursor, messages):
+    """
+    Replace the product mentions of a batch of messages: earlier mentions
+    of these messages are deleted (an edited text may drop a product) and
+    the current ones are COPY'd in. Returns the number of mention rows.
+    """
+    # a batch may repeat a message; keep one copy so the key stays unique
+    messages = list({(msg["channel_name"], str(msg["message_id"])): msg for msg in messages}.values())
+    schema = db_conf["raw_schema"]
+    columns = ", ".join(MENTION_COLUMNS)
+    cursor.execute(f"""
+        DELETE FROM {schema}.message_product_mentions m
+        USING unnest(%s::text[], %s::bigint[]) AS k(channel_name, message_id)
+        WHERE m.channel_name = k.channel_name AND m.message_id = k.message_id;
+    """, (
+        [msg["channel_name"] for msg in messages],
+        [int(msg["message_id"]) for msg in messages],
+    ))
+    cursor.copy_expert(
+        f"COPY {schema}.message_product_mentions ({columns}) FROM STDIN WITH (FORMAT csv)",
+        CsvRowStream(mention_rows(messages)),
+    )
+    return cursor.rowcount
+
+def load_batches(cursor, batches, mode):
+    """
+    Write batches with the chosen mode, creating any month partitions they
+    need first, and extract their product mentions. Messages without a date
+    or channel can't be keyed or partitioned and are skipped.
+    """
+    loaded = 0
+    for batch in batches:
+        keyed = [msg for msg in batch if msg.get("message_date") and msg.get("channel_name")]
+        if len(keyed) < len(batch):
+            logger.warning(f"Skipping {len(batch) - len(keyed)} messages without a date or channel")
+        ensure_partitions({month_start(msg["message_date"]) for msg in keyed})
+        if mode == "copy":
+            loaded += copy_messages(cursor, keyed)
+        else:
+            # only messages that made it in get their mentions
+            keyed = insert_messages_rowwise(cursor, keyed)
+            loaded += len(keyed)
+        copy_mentions(cursor, keyed)
+    return loaded
+
+def load_file(json_file, mode="copy", entry=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream one file's messages into the database in batches, all in one
+    transaction. In copy mode a COPY rejected for bad data is rolled back
+    and the file is re-read and retried row by row, skipping the rows that
+    fail; other errors propagate. The file's manifest entry is recorded
+    in the same transaction as its rows.
+    """
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        if mode == "copy":
+            try:
+                loaded = load_batches(cursor, iter_message_batches(json_file, batch_size), "copy")
+            except ROW_ERRORS as e:
+                conn.rollback()
+                logger.warning(f"COPY failed for {json_file.name} ({e}); falling back to row inserts")
+                loaded = load_batches(cursor, iter_message_batches(json_file, batch_size), "row")
+        else:
+            loaded = load_batches(cursor, iter_message_batches(json_file, batch_size), "row")
+        if entry:
+            record_manifest(cursor, entry, "loaded", loaded)
+        conn.commit()
+    return loaded
+
+def process_file(json_file, mode="copy", entry=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Parse and load one raw file. Returns (file name, rows loaded, error);
+    failures (unreadable files included) are recorded in the manifest rather
+    than raised, so one bad file never stops the others. Runs in loader
+    worker processes.
+    """
+    logger.info(f"Loading file: {json_file.name}")
+    try:
+        loaded = load_file(json_file, mode, entry, batch_size)
+    except Exception as e:
+        logger.error(f"Error loading {json_file.name}: {e}")
+        if entry:
+            record_failure(entry, e)
+        return json_file.name, 0, str(e)
+
+    logger.info(f"Loaded {loaded} messages from {json_file.name}")
+    return json_file.name, loaded, None
+
+def load_json_files(
+    mode="copy",
+    folder=MESSAGES_FOLDER,
+    full_reload=False,
+    workers=1,
+    batch_size=DEFAULT_BATCH_SIZE,
+):
+    """
+    Read new or modified raw files (JSON, NDJSON or Parquet) in
+    data/raw/messages/ (including subfolders) and load them into PostgreSQL,
+    either with COPY + merge (default) or row by row. Files the manifest
+    shows as already loaded and unchanged are skipped unless full_reload.
+
+    With workers > 1, files are parsed and loaded in that many processes,
+    each writing through its own connection pool, one transaction per file.
+    Messages are parsed incrementally and written batch_size at a time.
+    Returns {file name: error} for the files that failed.
     """
     create_raw_schema()
     create_raw_table()
+    create_manifest_table()
+    create_mentions_table()
 
-    json_files = list(MESSAGES_FOLDER.rglob("*.json"))
+    json_files = find_raw_files(folder)
     if not json_files:
-        logger.warning(f"No JSON files found in {MESSAGES_FOLDER}")
-        return
+        logger.warning(f"No raw files found in {folder}")
+        return {}
 
+    manifest = {} if full_reload else fetch_manifest()
+    jobs = []
     for json_file in json_files:
-        logger.info(f"Loading file: {json_file.name}")
-        with open(json_file, "r", encoding="utf-8") as f:
-            try:
-                messages = json.load(f)
-            except json.JSONDecodeError as e:
-                logger.error(f"Error reading {json_file.name}: {e}")
-                continue
+        entry = manifest_entry(json_file, folder, manifest)
+        if entry is not None:
+            jobs.append((json_file, entry))
+    logger.info(f"Skipped {len(json_files) - len(jobs)} unchanged files already in the manifest")
 
-        conn = get_connection()
-        cursor = conn.cursor()
+    if workers > 1 and len(jobs) > 1:
+        # Workers open their own pools; don't hand them this process's sockets
+        close_pool()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                process_file,
+                [json_file for json_file, _ in jobs],
+                [mode] * len(jobs),
+                [entry for _, entry in jobs],
+                [batch_size] * len(jobs),
+            ))
+    else:
+        results = [process_file(json_file, mode, entry, batch_size) for json_file, entry in jobs]
 
-        inserted_count = 0
-        for msg in messages:
-            try:
-                cursor.execute(f"""
-                    INSERT INTO {db_conf['raw_schema']}.telegram_messages
-                    (message_id, channel_name, post_date, message_text, view_count, forward_count, has_image, raw_json)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (message_id) DO NOTHING;
-                """, (
-                    str(msg.get("message_id")),           # Correct key
-                    msg.get("channel_name"),
-                    msg.get("message_date"),              # Correct key
-                    msg.get("message_text"),
-                    msg.get("views", 0),                  # Correct key
-                    msg.get("forwards", 0),               # Correct key
-                    bool(msg.get("has_media")),           # Correct key
-                    json.dumps(msg)
-                ))
-                inserted_count += 1
-            except Exception as e:
-                logger.error(f"Error inserting message {msg.get('message_id')}: {e}")
+    errors = {name: error for name, _, error in results if error}
+    total = sum(loaded for _, loaded, _ in results)
+    logger.info(f"Loaded {total} messages from {len(jobs) - len(errors)} files; {len(errors)} failed")
+    for name, error in errors.items():
+        logger.error(f"  {name}: {error}")
+    return errors
 
-        conn.commit()
-        cursor.close()
-        conn.close()
-        logger.info(f"Loaded {inserted_count} messages from {json_file.name}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load raw Telegram messages into PostgreSQL")
+    parser.add_argument(
+        "--mode",
+        choices=["copy", "row"],
+        default="copy",
+        help="copy: COPY into a staging table and merge; row: one INSERT per message",
+    )
+    parser.add_argument(
+        "--full-reload",
+        action="store_true",
+        help="Ignore the ingestion manifest and reload every raw file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes parsing and loading files in parallel",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Messages parsed and written per batch",
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    load_json_files()
+    args = parse_args()
+    load_json_files(
+        mode=args.mode,
+        full_reload=args.full_reload,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
     logger.info("All JSON files loaded successfully!")
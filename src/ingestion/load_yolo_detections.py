@@ -0,0 +1,193 @@
+# src/ingestion/load_yolo_detections.py
+
+import logging
+from src.ingestion.db import pooled_connection, create_raw_schema, db_conf
+from src.ingestion.load_telegram_messages import CsvRowStream
+
+# Configure logger
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+# Images buffered before a COPY round trip
+DEFAULT_BATCH_SIZE = 500
+
+DETECTION_COLUMNS = ("channel_name", "message_id", "image_path", "detected_class", "confidence_score")
+
+SUMMARY_COLUMNS = (
+    "channel_name", "message_id", "image_path", "image_category",
+    "detected_classes", "object_count", "max_confidence", "model_key",
+)
+
+SUMMARY_KEY = ("channel_name", "message_id")
+
+def create_detection_tables():
+    """
+    Create raw.yolo_detections (one row per detected object) and
+    raw.yolo_image_summary (one row per message image, with its category),
+    both keyed on (channel_name, message_id)
+    """
+    create_raw_schema()
+    schema = db_conf["raw_schema"]
+    try:
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {schema}.yolo_detections (
+                    channel_name TEXT NOT NULL,
+                    message_id BIGINT NOT NULL,
+                    image_path TEXT,
+                    detected_class TEXT NOT NULL,
+                    confidence_score REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS yolo_detections_message_idx
+                    ON {schema}.yolo_detections (channel_name, message_id);
+
+                CREATE TABLE IF NOT EXISTS {schema}.yolo_image_summary (
+                    channel_name TEXT NOT NULL,
+                    message_id BIGINT NOT NULL,
+                    image_path TEXT,
+                    image_category TEXT NOT NULL,
+                    detected_classes TEXT,
+                    object_count INTEGER NOT NULL,
+                    max_confidence REAL,
+                    model_key TEXT,
+                    processed_at TIMESTAMP DEFAULT now(),
+                    PRIMARY KEY (channel_name, message_id)
+                );
+            """)
+            conn.commit()
+        logger.info("Tables 'raw.yolo_detections' and 'raw.yolo_image_summary' ensured in database.")
+    except Exception as e:
+        logger.error(f"Error creating detection tables: {e}")
+        raise
+
+def parse_message_id(msg_id):
+    """
+    Message ids from image file names are strings; anything non-numeric
+    can't be joined to a message and is skipped
+    """
+    try:
+        return int(msg_id)
+    except (TypeError, ValueError):
+        logger.warning(f"Skipping detections for non-numeric message id: {msg_id}")
+        return None
+
+class DetectionLoader:
+    """
+    Buffers per-image YOLO results and bulk-loads them with COPY. Every
+    flush replaces the detections of the messages whose results changed,
+    so re-running enrichment on an image never duplicates its objects and
+    leaves unchanged messages (and their processed_at) untouched.
+    """
+    def __init__(self, model_key=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.model_key = model_key
+        self.batch_size = batch_size
+        self.detection_rows = []
+        self.summary_rows = []
+        self.images = 0
+        self.loaded_messages = 0
+
+    def __enter__(self):
+        create_detection_tables()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def add(self, image_path, refs, detections, image_category):
+        """
+        Queue one image: refs are its (channel_name, message_id) pairs and
+        detections its (class, confidence) pairs
+        """
+        classes = ", ".join(sorted({cls for cls, _ in detections}))
+        max_confidence = max((conf for _, conf in detections), default=None)
+
+        for channel_name, msg_id in refs:
+            message_id = parse_message_id(msg_id)
+            if message_id is None:
+                continue
+            self.summary_rows.append((
+                channel_name, message_id, str(image_path), image_category,
+                classes or None, len(detections), max_confidence, self.model_key,
+            ))
+            self.detection_rows.extend(
+                (channel_name, message_id, str(image_path), cls, conf)
+                for cls, conf in detections
+            )
+
+        self.images += 1
+        if self.images % self.batch_size == 0:
+            self.flush()
+
+    def flush(self):
+        if not self.summary_rows:
+            return
+
+        schema = db_conf["raw_schema"]
+        detection_columns = ", ".join(DETECTION_COLUMNS)
+        summary_columns = ", ".join(SUMMARY_COLUMNS)
+        key = ", ".join(SUMMARY_KEY)
+
+        with pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS staging_yolo_detections
+                (LIKE {schema}.yolo_detections);
+                CREATE TEMP TABLE IF NOT EXISTS staging_yolo_image_summary
+                (LIKE {schema}.yolo_image_summary INCLUDING DEFAULTS);
+                TRUNCATE staging_yolo_detections, staging_yolo_image_summary;
+            """)
+            cursor.copy_expert(
+                f"COPY staging_yolo_image_summary ({summary_columns}) FROM STDIN WITH (FORMAT csv)",
+                CsvRowStream(self.summary_rows),
+            )
+            cursor.copy_expert(
+                f"COPY staging_yolo_detections ({detection_columns}) FROM STDIN WITH (FORMAT csv)",
+                CsvRowStream(self.detection_rows),
+            )
+            # Batch runs re-emit cached images; only messages whose summary
+            # is new or differs get processed_at bumped and their objects
+            # rewritten, so unchanged images don't look fresh downstream.
+            cursor.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS staging_yolo_changed (
+                    channel_name TEXT NOT NULL,
+                    message_id BIGINT NOT NULL
+                );
+                TRUNCATE staging_yolo_changed;
+
+                WITH upserted AS (
+                    INSERT INTO {schema}.yolo_image_summary AS t ({summary_columns})
+                    SELECT DISTINCT ON ({key}) {summary_columns}
+                    FROM staging_yolo_image_summary
+                    ORDER BY {key}
+                    ON CONFLICT ({key}) DO UPDATE SET
+                        image_path = EXCLUDED.image_path,
+                        image_category = EXCLUDED.image_category,
+                        detected_classes = EXCLUDED.detected_classes,
+                        object_count = EXCLUDED.object_count,
+                        max_confidence = EXCLUDED.max_confidence,
+                        model_key = EXCLUDED.model_key,
+                        processed_at = now()
+                    WHERE (t.image_path, t.image_category, t.detected_classes,
+                           t.object_count, t.max_confidence, t.model_key)
+                        IS DISTINCT FROM
+                          (EXCLUDED.image_path, EXCLUDED.image_category, EXCLUDED.detected_classes,
+                           EXCLUDED.object_count, EXCLUDED.max_confidence, EXCLUDED.model_key)
+                    RETURNING t.channel_name, t.message_id
+                )
+                INSERT INTO staging_yolo_changed ({key})
+                SELECT {key} FROM upserted;
+
+                DELETE FROM {schema}.yolo_detections d
+                USING staging_yolo_changed c
+                WHERE d.channel_name = c.channel_name AND d.message_id = c.message_id;
+
+                INSERT INTO {schema}.yolo_detections ({detection_columns})
+                SELECT {detection_columns}
+                FROM staging_yolo_detections
+                JOIN staging_yolo_changed USING ({key});
+            """)
+            conn.commit()
+
+        self.loaded_messages += len(self.summary_rows)
+        self.detection_rows = []
+        self.summary_rows = []
@@ -0,0 +1,149 @@
+# src/ingestion/parquet_landing.py
+
+import os
+import logging
+from datetime import datetime
+from pathlib import Path
+
+from src.scraping.raw_writer import new_run_id
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet landing is optional
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Explicit schemas so every part file agrees regardless of which values
+# happened to be null in a given batch
+MESSAGE_SCHEMA = pa.schema([
+    ("message_id", pa.int64()),
+    ("channel_name", pa.string()),
+    ("message_date", pa.timestamp("us", tz="UTC")),
+    ("message_text", pa.string()),
+    ("views", pa.int64()),
+    ("forwards", pa.int64()),
+    ("has_media", pa.bool_()),
+    ("image_path", pa.string()),
+]) if pa else None
+
+DETECTION_SCHEMA = pa.schema([
+    ("message_id", pa.string()),
+    ("channel_name", pa.string()),
+    ("image_path", pa.string()),
+    ("detected_class", pa.string()),
+    ("confidence_score", pa.float64()),
+    ("image_category", pa.string()),
+]) if pa else None
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Parquet landing requires the 'pyarrow' package")
+
+
+def partition_dir(base_path, channel_name, date_partition=None):
+    """
+    Hive-style partition folder: <base>/date=YYYY-MM-DD/channel=<name>
+    """
+    date_partition = date_partition or datetime.now().strftime("%Y-%m-%d")
+    return Path(base_path) / f"date={date_partition}" / f"channel={channel_name}"
+
+
+class ParquetMessageWriter:
+    """
+    Drop-in alternative to RawMessageWriter that lands messages as Parquet,
+    one row group per `row_group_size` messages. The file is written under a
+    temp name and renamed into place on close.
+    """
+
+    def __init__(self, base_path, channel_name, row_group_size=10000):
+        require_pyarrow()
+        self.output_dir = partition_dir(base_path, channel_name)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        name = f"part-{new_run_id()}.parquet"
+        self._final_path = self.output_dir / name
+        self._tmp_path = self.output_dir / f".{name}.part"
+
+        self.row_group_size = row_group_size
+        self.count = 0
+        self.paths = []
+        self._rows = []
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, message):
+        row = dict(message)
+        if row.get("message_date"):
+            row["message_date"] = datetime.fromisoformat(row["message_date"])
+        self._rows.append(row)
+        self.count += 1
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._tmp_path, self._final_path)
+            self.paths.append(self._final_path)
+            logger.info(f"Wrote raw part {self._final_path}")
+            self._writer = None
+        return self.paths
+
+    def _flush(self):
+        if not self._rows:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self._tmp_path, MESSAGE_SCHEMA, compression="zstd")
+        self._writer.write_table(pa.Table.from_pylist(self._rows, schema=MESSAGE_SCHEMA))
+        self._rows = []
+
+
+def write_detections_parquet(rows, base_path):
+    """
+    Land YOLO detection rows as one Parquet file per channel,
+    <base>/channel=<name>/detections.parquet. Every run emits the full
+    detection set (cached images included), so each file is a snapshot
+    that replaces the previous run's rather than a dated partition that
+    would count an image once per run day.
+    """
+    require_pyarrow()
+    by_channel = {}
+    for row in rows:
+        by_channel.setdefault(row["channel_name"], []).append(row)
+
+    paths = []
+    for channel_name, channel_rows in by_channel.items():
+        output_dir = Path(base_path) / f"channel={channel_name}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        final_path = output_dir / "detections.parquet"
+        tmp_path = output_dir / ".detections.parquet.part"
+        table = pa.Table.from_pylist(channel_rows, schema=DETECTION_SCHEMA)
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, final_path)
+        paths.append(final_path)
+    return paths
+
+
+def iter_parquet_messages(path, batch_size=5000):
+    """
+    Yield lists of raw message dicts (the shape extract_message_data
+    produces) from a landed Parquet file, one record batch at a time
+    """
+    require_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        messages = batch.to_pylist()
+        for msg in messages:
+            if msg["message_date"] is not None:
+                msg["message_date"] = msg["message_date"].isoformat()
+        yield messages
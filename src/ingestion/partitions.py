@@ -0,0 +1,169 @@
+# src/ingestion/partitions.py
+
+import logging
+from datetime import date
+from src.ingestion.db import pooled_connection, db_conf
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "telegram_messages"
+DEFAULT_PARTITION = "telegram_messages_default"
+
+# Months already known to have a partition, per process
+_known_months = set()
+
+def month_start(value):
+    """
+    First day of the month of a date, datetime or ISO date string
+    """
+    if isinstance(value, str):
+        return date(int(value[:4]), int(value[5:7]), 1)
+    return date(value.year, value.month, 1)
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month):
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+def create_partitioned_table(cursor):
+    """
+    Create raw.telegram_messages partitioned by month of post_date, keyed on
+    (channel_name, message_id). Postgres requires the partition column in
+    every unique constraint, so post_date is part of the primary key too.
+    loaded_at records the last insert or update of a row, so incremental
+    dbt models can pick up late view-count changes.
+
+    Forgets the months cached as known: the table may have been dropped
+    (or the schema switched) since they were created.
+    """
+    _known_months.clear()
+    schema = db_conf["raw_schema"]
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {schema}.{PARENT_TABLE} (
+            message_id TEXT NOT NULL,
+            channel_name TEXT NOT NULL,
+            post_date TIMESTAMP NOT NULL,
+            message_text TEXT,
+            view_count INTEGER,
+            forward_count INTEGER,
+            has_image BOOLEAN,
+            raw_json JSONB,
+            loaded_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (channel_name, message_id, post_date)
+        ) PARTITION BY RANGE (post_date);
+        ALTER TABLE {schema}.{PARENT_TABLE}
+            ADD COLUMN IF NOT EXISTS loaded_at TIMESTAMP NOT NULL DEFAULT now();
+        CREATE INDEX IF NOT EXISTS {PARENT_TABLE}_loaded_at_idx
+            ON {schema}.{PARENT_TABLE} (loaded_at);
+        CREATE INDEX IF NOT EXISTS {PARENT_TABLE}_post_date_idx
+            ON {schema}.{PARENT_TABLE} (post_date);
+        CREATE INDEX IF NOT EXISTS {PARENT_TABLE}_channel_name_idx
+            ON {schema}.{PARENT_TABLE} (channel_name);
+        CREATE TABLE IF NOT EXISTS {schema}.{DEFAULT_PARTITION}
+            PARTITION OF {schema}.{PARENT_TABLE} DEFAULT;
+    """)
+
+def is_legacy_table(cursor):
+    """
+    True if raw.telegram_messages exists as a plain (unpartitioned) table
+    """
+    cursor.execute("""
+        SELECT c.relkind
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = %s AND c.relname = %s;
+    """, (db_conf["raw_schema"], PARENT_TABLE))
+    row = cursor.fetchone()
+    return row is not None and row[0] == "r"
+
+def create_month_partition(cursor, month):
+    """
+    Create and attach the partition for one month. Rows for that month that
+    landed in the default partition are moved into it first, otherwise the
+    attach would fail. Serialized across loader processes with an advisory
+    lock held for the transaction.
+    """
+    schema = db_conf["raw_schema"]
+    name = partition_name(month)
+    cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s));", (f"{schema}.{name}",))
+    cursor.execute("SELECT to_regclass(%s);", (f"{schema}.{name}",))
+    if cursor.fetchone()[0] is not None:
+        return False
+
+    bounds = (month, add_months(month, 1))
+    cursor.execute(f"""
+        CREATE TABLE {schema}.{name}
+            (LIKE {schema}.{PARENT_TABLE} INCLUDING DEFAULTS);
+    """)
+    cursor.execute(f"""
+        WITH moved AS (
+            DELETE FROM {schema}.{DEFAULT_PARTITION}
+            WHERE post_date >= %s AND post_date < %s
+            RETURNING *
+        )
+        INSERT INTO {schema}.{name} SELECT * FROM moved;
+    """, bounds)
+    cursor.execute(f"""
+        ALTER TABLE {schema}.{PARENT_TABLE}
+            ATTACH PARTITION {schema}.{name} FOR VALUES FROM (%s) TO (%s);
+    """, bounds)
+    logger.info(f"Created partition {schema}.{name}")
+    return True
+
+def ensure_partitions(months):
+    """
+    Make sure a partition exists for each month, in a short transaction of
+    its own so loads never hold partition DDL locks
+    """
+    missing = sorted(set(months) - _known_months)
+    if not missing:
+        return
+    with pooled_connection() as conn, conn.cursor() as cursor:
+        for month in missing:
+            create_month_partition(cursor, month)
+        conn.commit()
+    _known_months.update(missing)
+
+def ensure_future_partitions(months_ahead=None):
+    """
+    Pre-create partitions for the current month and the next few
+    """
+    if months_ahead is None:
+        months_ahead = db_conf.get("partition_months_ahead", 3)
+    current = month_start(date.today())
+    ensure_partitions(add_months(current, offset) for offset in range(months_ahead + 1))
+
+def migrate_legacy_table(cursor):
+    """
+    Convert an unpartitioned raw.telegram_messages (message_id primary key)
+    to the partitioned layout. The old table is kept as
+    telegram_messages_legacy; rows without a post_date or channel cannot be
+    keyed and stay behind in it.
+    """
+    schema = db_conf["raw_schema"]
+    legacy = f"{PARENT_TABLE}_legacy"
+    logger.info(f"Migrating {schema}.{PARENT_TABLE} to a partitioned table")
+
+    cursor.execute(f"ALTER TABLE {schema}.{PARENT_TABLE} RENAME TO {legacy};")
+    cursor.execute(f"ALTER INDEX IF EXISTS {schema}.{PARENT_TABLE}_pkey RENAME TO {legacy}_pkey;")
+    create_partitioned_table(cursor)
+
+    cursor.execute(f"""
+        SELECT DISTINCT date_trunc('month', post_date)::date
+        FROM {schema}.{legacy}
+        WHERE post_date IS NOT NULL;
+    """)
+    for (month,) in cursor.fetchall():
+        create_month_partition(cursor, month)
+
+    cursor.execute(f"""
+        INSERT INTO {schema}.{PARENT_TABLE}
+        SELECT * FROM {schema}.{legacy}
+        WHERE post_date IS NOT NULL AND channel_name IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    """)
+    logger.info(
+        f"Migrated {cursor.rowcount} rows; {schema}.{legacy} can be dropped once verified"
+    )
@@ -0,0 +1,136 @@
+# src/ingestion/product_matcher.py
+
+import logging
+import os
+import unicodedata
+from collections import deque
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DICTIONARY_FILE = Path(
+    os.getenv("PRODUCT_DICTIONARY", Path(__file__).parent / "product_dictionary.yaml")
+)
+
+def normalize(text):
+    """
+    NFC-normalise and casefold. Ge'ez (Amharic) script has no case, so this
+    only folds Latin text, but NFC makes composed and decomposed forms of
+    the same syllable compare equal.
+    """
+    return unicodedata.normalize("NFC", text).casefold()
+
+def is_word_char(char):
+    # letters (incl. Ge'ez syllables), combining marks and digits; the
+    # Ethiopic wordspace and full stop are punctuation and end a word
+    return unicodedata.category(char)[0] in ("L", "M", "N")
+
+class ProductMatcher:
+    """
+    Aho-Corasick automaton over every product name and alias, so one pass
+    over a message finds all mentions regardless of dictionary size.
+
+    Matches must start and end on word boundaries; overlapping matches
+    resolve to the leftmost, then longest, alias.
+    """
+    def __init__(self, products):
+        # products: {canonical name: [alias, ...]}
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [None]  # (alias length, canonical) ending at this node
+
+        for canonical, aliases in products.items():
+            for alias in {canonical, *aliases}:
+                self._add(normalize(alias), canonical)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path=DICTIONARY_FILE):
+        """
+        Load a YAML dictionary of the form
+            products:
+              - name: Paracetamol
+                aliases: [acetaminophen, panadol, ፓራሲታሞል]
+        """
+        with open(path, encoding="utf-8") as f:
+            entries = yaml.safe_load(f)["products"]
+        products = {entry["name"]: entry.get("aliases", []) for entry in entries}
+        logger.info(f"Loaded {len(products)} products from {path}")
+        return cls(products)
+
+    def _add(self, alias, canonical):
+        alias = alias.strip()
+        if not alias:
+            return
+        node = 0
+        for char in alias:
+            if char not in self.goto[node]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(None)
+                self.goto[node][char] = len(self.goto) - 1
+            node = self.goto[node][char]
+        self.output[node] = (len(alias), canonical)
+
+    def _build_failure_links(self):
+        # dict_suffix[n]: nearest node on n's failure chain that ends an alias
+        self.dict_suffix = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                suffix = self.fail[child]
+                self.dict_suffix[child] = suffix if self.output[suffix] else self.dict_suffix[suffix]
+                queue.append(child)
+
+    def _raw_matches(self, text):
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+
+            hit = node if self.output[node] else self.dict_suffix[node]
+            while hit:
+                length, canonical = self.output[hit]
+                yield end - length, end, canonical
+                hit = self.dict_suffix[hit]
+
+    def find(self, text):
+        """
+        Return [(start, end, canonical name), ...] for every whole-word
+        mention in text, non-overlapping, in order
+        """
+        if not text:
+            return []
+        text = normalize(text)
+
+        candidates = [
+            (start, end, canonical)
+            for start, end, canonical in self._raw_matches(text)
+            if (start == 0 or not is_word_char(text[start - 1]))
+            and (end == len(text) or not is_word_char(text[end]))
+        ]
+        candidates.sort(key=lambda match: (match[0], -match[1]))
+
+        matches, covered_to = [], 0
+        for start, end, canonical in candidates:
+            if start >= covered_to:
+                matches.append((start, end, canonical))
+                covered_to = end
+        return matches
+
+    def count(self, text):
+        """
+        Return {canonical name: mentions} for one message
+        """
+        counts = {}
+        for _, _, canonical in self.find(text):
+            counts[canonical] = counts.get(canonical, 0) + 1
+        return counts
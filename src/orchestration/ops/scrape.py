@@ -1,8 +1,9 @@
 # src/orchestration/ops/scrape.py
+import asyncio
 from dagster import op
-from src.scraping.scrapper import main as run_scraper  # replace `main` with the actual function name
+from src.scraping.scrapper import main as run_scraper
 
 @op
 def scrape_telegram_data():
-    """Scrape Telegram messages"""
-    run_scraper()
+    """Scrape Telegram messages (channels run concurrently unless configured serial)"""
+    asyncio.run(run_scraper())
@@ -2,13 +2,10 @@
 Task 1 - Data Scraping and Collection (Extract & Load)
 
 This script is the main entry point for scraping Telegram channels,
-downloading images, storing raw JSON data, and logging scraping activity.
+downloading images, storing raw NDJSON data, and logging scraping activity.
 """
 
 import asyncio
-import json
-import os
-from datetime import datetime
 from typing import Any, Dict, List
 
 from telethon import TelegramClient, errors  # type: ignore
@@ -16,6 +13,7 @@ from telethon import TelegramClient, errors  # type: ignore
 from scrapping.telegram_client import get_telegram_client
 from scrapping.message_scraper import scrape_channel_messages
 from scrapping.logger import get_logger
+from src.scraping.raw_writer import RawMessageWriter
 from config import load_scraping_config
 
 logger = get_logger(__name__)
@@ -27,7 +25,7 @@ async def run_scraper() -> None:
     - Connects to Telegram
     - Iterates through configured channels
     - Extracts messages
-    - Writes raw JSON to disk
+    - Streams raw NDJSON to disk
     - Logs scraping activity
 
     Raises:
@@ -43,8 +41,8 @@ async def run_scraper() -> None:
         logger.exception("Failed to start Telegram client.")
         raise RuntimeError("Telegram client initialization failed") from e
 
-    today: str = datetime.utcnow().strftime("%Y-%m-%d")
     raw_data_path: str = config["storage"].get("raw_data_path", "data/raw")
+    raw_compression = config["storage"].get("raw_compression")
 
     for channel in config.get("telegram", {}).get("channels", []):
         channel_name: str = channel.get("name")
@@ -67,20 +65,19 @@ async def run_scraper() -> None:
             logger.exception(f"Failed to scrape messages for channel {channel_name}")
             continue
 
-        # ---------- JSON WRITING ----------
-        output_dir: str = os.path.join(raw_data_path, today)
-        os.makedirs(output_dir, exist_ok=True)
-
-        output_file: str = os.path.join(output_dir, f"{channel_name}.json")
+        # ---------- NDJSON WRITING ----------
         try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(messages, f, ensure_ascii=False, indent=2, default=str)
+            with RawMessageWriter(
+                raw_data_path, channel_name, compression=raw_compression
+            ) as writer:
+                for message in messages:
+                    writer.write(message)
         except OSError as e:
-            logger.exception(f"Failed to write messages to {output_file}")
+            logger.exception(f"Failed to write messages for {channel_name}")
             continue
 
         logger.info(
-            f"Finished scraping {channel_name}. Messages saved to {output_file}"
+            f"Finished scraping {channel_name}. Messages saved to {writer.paths}"
         )
 
     try:
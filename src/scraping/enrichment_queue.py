@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+PENDING = "pending"
+CLAIMED = "claimed"
+DONE = "done"
+FAILED = "failed"
+
+# Back to pending for another try, or failed once out of attempts
+RETRY_OR_FAIL = "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+
+
+class EnrichmentQueue:
+    """
+    Durable work queue between the scraper and the streaming detection
+    worker, stored in SQLite so both processes can share it.
+
+    The scraper enqueues every photo it saves; the worker claims jobs in
+    micro-batches and marks them done once their detections are written.
+    A claim is a lease: jobs claimed by a worker that crashed return to
+    pending after `lease_seconds`, so nothing is lost and nothing is
+    processed twice while its worker is alive. Every claim counts as an
+    attempt, including ones lost to a crash, so an image that keeps
+    killing the worker ends up failed after `max_attempts`.
+
+    The connection is shared across threads behind a lock so the scraper
+    can run its calls off the event loop (`put_async`, `wait_for_room`).
+    """
+
+    def __init__(self, path, lease_seconds=600, max_attempts=3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._backpressure_lifted = False
+        self.conn = sqlite3.connect(
+            self.path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_name TEXT NOT NULL,
+                message_id INTEGER NOT NULL,
+                image_path TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claimed_by TEXT,
+                claimed_at REAL,
+                enqueued_at REAL NOT NULL,
+                error TEXT,
+                UNIQUE (channel_name, message_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+        """)
+
+    def put(self, channel_name, message_id, image_path):
+        """
+        Queues a photo for detection. A message already queued is only
+        reset to pending (with fresh attempts) when its image path changed;
+        otherwise its job, done or failed, is left alone.
+        """
+        with self._lock:
+            self._put(channel_name, message_id, image_path)
+
+    async def put_async(self, channel_name, message_id, image_path):
+        """
+        `put` on a worker thread, so a worker holding the write lock does
+        not stall the scraper's event loop.
+        """
+        await asyncio.to_thread(self.put, channel_name, message_id, image_path)
+
+    def _put(self, channel_name, message_id, image_path):
+        self.conn.execute(
+            """
+            INSERT INTO jobs (channel_name, message_id, image_path, enqueued_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (channel_name, message_id) DO UPDATE SET
+                image_path = excluded.image_path,
+                status = 'pending',
+                attempts = 0,
+                error = NULL,
+                enqueued_at = excluded.enqueued_at
+            WHERE jobs.image_path IS NOT excluded.image_path
+            """,
+            (channel_name, message_id, str(image_path), time.time()),
+        )
+
+    def depth(self):
+        """
+        Jobs waiting for or being processed by a worker.
+        """
+        with self._lock:
+            (count,) = self.conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (PENDING, CLAIMED)
+            ).fetchone()
+        return count
+
+    async def wait_for_room(self, max_depth, max_wait=None, poll_interval=1.0):
+        """
+        Back-pressure for the scraper: waits while the worker is more than
+        `max_depth` jobs behind. After `max_wait` seconds without progress
+        (e.g. no worker is running) it logs a warning and stops applying
+        back-pressure until the queue drops below `max_depth` again.
+        Returns False if it gave up.
+        """
+        if not max_depth:
+            return True
+        started = time.monotonic()
+        while await asyncio.to_thread(self.depth) >= max_depth:
+            if self._backpressure_lifted:
+                return False
+            if max_wait is not None and time.monotonic() - started >= max_wait:
+                self._backpressure_lifted = True
+                logging.warning(
+                    f"Enrichment queue still holds {max_depth}+ jobs after {max_wait}s; "
+                    "is the enrichment worker running? Continuing without back-pressure"
+                )
+                return False
+            await asyncio.sleep(poll_interval)
+        self._backpressure_lifted = False
+        return True
+
+    def claim(self, limit, worker_id=None):
+        """
+        Leases up to `limit` pending jobs, oldest first. Returns
+        [(job_id, channel_name, message_id, image_path), ...].
+        """
+        worker_id = worker_id or str(os.getpid())
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._requeue_expired()
+                rows = self.conn.execute(
+                    "SELECT id, channel_name, message_id, image_path FROM jobs "
+                    "WHERE status = ? ORDER BY id LIMIT ?",
+                    (PENDING, limit),
+                ).fetchall()
+                self.conn.executemany(
+                    "UPDATE jobs SET status = ?, claimed_by = ?, claimed_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    [(CLAIMED, worker_id, time.time(), row[0]) for row in rows],
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def complete(self, job_ids):
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE jobs SET status = ?, error = NULL WHERE id = ? AND status = ?",
+                [(DONE, job_id, CLAIMED) for job_id in job_ids],
+            )
+
+    def fail(self, job_ids, error):
+        """
+        Returns jobs to pending for another try, or parks them as failed
+        once they have used up their attempts.
+        """
+        with self._lock:
+            self.conn.executemany(
+                RETRY_OR_FAIL + "error = ? WHERE id = ? AND status = ?",
+                [
+                    (self.max_attempts, FAILED, PENDING, str(error), job_id, CLAIMED)
+                    for job_id in job_ids
+                ],
+            )
+
+    def release_claims(self, worker_id=None):
+        """
+        Returns a worker's leased jobs to pending, e.g. when it restarts
+        after a crash under the same id. The lost claim counts as an
+        attempt; jobs out of attempts are failed instead.
+        """
+        worker_id = worker_id or str(os.getpid())
+        with self._lock:
+            self.conn.execute(
+                RETRY_OR_FAIL + "error = ? WHERE status = ? AND claimed_by = ?",
+                (self.max_attempts, FAILED, PENDING, "worker restarted mid-claim",
+                 CLAIMED, worker_id),
+            )
+
+    def _requeue_expired(self):
+        self.conn.execute(
+            RETRY_OR_FAIL + "error = ? WHERE status = ? AND claimed_at < ?",
+            (self.max_attempts, FAILED, PENDING, "claim lease expired",
+             CLAIMED, time.time() - self.lease_seconds),
+        )
+
+    def purge_done(self, older_than_seconds=7 * 24 * 3600):
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM jobs WHERE status = ? AND enqueued_at < ?",
+                (DONE, time.time() - older_than_seconds),
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,200 @@
+import hashlib
+import logging
+import os
+import sqlite3
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # without Pillow only exact duplicates are detected
+    Image = None
+
+# dHash is 64 bits; split into 4 bands so any hash within distance 3
+# shares at least one band exactly (pigeonhole) and can be found by index.
+PHASH_BANDS = 4
+PHASH_BAND_BITS = 16
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dhash(path, hash_size=8):
+    """
+    Difference hash: 64-bit perceptual hash robust to re-encoding and resizing.
+    """
+    with Image.open(path) as img:
+        pixels = list(img.convert("L").resize((hash_size + 1, hash_size)).getdata())
+
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def phash_bands(value):
+    mask = (1 << PHASH_BAND_BITS) - 1
+    return [(value >> (band * PHASH_BAND_BITS)) & mask for band in range(PHASH_BANDS)]
+
+
+class ImageStore:
+    """
+    Content-addressed photo store shared by all channels.
+
+    Files live once under <root>/objects/<sha[:2]>/<sha>.jpg. A SQLite index
+    maps every message to its canonical image; a download whose bytes (or,
+    with Pillow installed, whose perceptual hash) match a stored image is
+    discarded and the message points at the existing copy.
+    """
+
+    def __init__(self, root, max_phash_distance=3):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.staging_dir = self.root / "staging"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.max_phash_distance = max_phash_distance
+
+        self.conn = sqlite3.connect(self.root / "image_index.sqlite")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS images (
+                sha256 TEXT PRIMARY KEY,
+                canonical_sha256 TEXT NOT NULL,
+                phash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS phash_bands (
+                band INTEGER NOT NULL,
+                value INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_phash_bands ON phash_bands (band, value);
+            CREATE TABLE IF NOT EXISTS message_images (
+                channel_name TEXT NOT NULL,
+                message_id INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                PRIMARY KEY (channel_name, message_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_message_images_sha ON message_images (sha256);
+        """)
+        self.conn.commit()
+
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+    def object_path(self, sha256):
+        return self.objects_dir / sha256[:2] / f"{sha256}.jpg"
+
+    def staging_path(self, channel_name, message_id):
+        return self.staging_dir / f"{channel_name}-{message_id}.jpg"
+
+    def lookup(self, channel_name, message_id):
+        """
+        Returns the canonical image path already recorded for a message, if any.
+        """
+        row = self.conn.execute(
+            "SELECT sha256 FROM message_images WHERE channel_name = ? AND message_id = ?",
+            (channel_name, message_id),
+        ).fetchone()
+        return self.object_path(row[0]) if row else None
+
+    def ingest(self, downloaded_path, channel_name, message_id):
+        """
+        Files a freshly downloaded photo and links the message to its
+        canonical image. Returns the canonical image path.
+        """
+        downloaded_path = Path(downloaded_path)
+        sha256 = file_sha256(downloaded_path)
+
+        row = self.conn.execute(
+            "SELECT canonical_sha256 FROM images WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if row:
+            canonical = row[0]
+            self.exact_duplicates += 1
+            downloaded_path.unlink()
+        else:
+            canonical = self._file_new_image(downloaded_path, sha256)
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO message_images (channel_name, message_id, sha256) VALUES (?, ?, ?)",
+            (channel_name, message_id, canonical),
+        )
+        self.conn.commit()
+        return self.object_path(canonical)
+
+    def _file_new_image(self, downloaded_path, sha256):
+        phash = None
+        if Image is not None:
+            try:
+                phash = dhash(downloaded_path)
+            except OSError as e:
+                logging.warning(f"Could not perceptually hash {downloaded_path}: {e}")
+
+        near = self._find_near_duplicate(phash) if phash is not None else None
+        if near:
+            canonical = near
+            self.near_duplicates += 1
+            downloaded_path.unlink()
+        else:
+            canonical = sha256
+            target = self.object_path(sha256)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(downloaded_path, target)
+            if phash is not None:
+                self.conn.executemany(
+                    "INSERT INTO phash_bands (band, value, sha256) VALUES (?, ?, ?)",
+                    [(band, value, sha256) for band, value in enumerate(phash_bands(phash))],
+                )
+
+        self.conn.execute(
+            "INSERT INTO images (sha256, canonical_sha256, phash) VALUES (?, ?, ?)",
+            (sha256, canonical, f"{phash:016x}" if phash is not None else None),
+        )
+        return canonical
+
+    def _find_near_duplicate(self, phash):
+        candidates = set()
+        for band, value in enumerate(phash_bands(phash)):
+            candidates.update(
+                sha for (sha,) in self.conn.execute(
+                    "SELECT sha256 FROM phash_bands WHERE band = ? AND value = ?", (band, value)
+                )
+            )
+
+        best, best_distance = None, self.max_phash_distance + 1
+        for sha in candidates:
+            (stored,) = self.conn.execute(
+                "SELECT phash FROM images WHERE sha256 = ?", (sha,)
+            ).fetchone()
+            distance = bin(int(stored, 16) ^ phash).count("1")
+            if distance < best_distance:
+                best, best_distance = sha, distance
+        return best
+
+    def unique_images(self):
+        """
+        Yields (image path, [(channel_name, message_id), ...]) once per
+        canonical image, with every message that references it.
+        """
+        rows = self.conn.execute(
+            "SELECT sha256, channel_name, message_id FROM message_images ORDER BY sha256"
+        )
+        current, refs = None, []
+        for sha256, channel_name, message_id in rows:
+            if sha256 != current and refs:
+                yield self.object_path(current), refs
+                refs = []
+            current = sha256
+            refs.append((channel_name, message_id))
+        if refs:
+            yield self.object_path(current), refs
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+
+from telethon.errors import FloodWaitError
+
+from src.scraping.metrics import get_metrics
+
+# Used to reserve byte budget when Telegram does not report a file size.
+DEFAULT_MEDIA_SIZE = 512 * 1024
+
+
+class MediaDownloader:
+    """
+    Downloads message photos on a pool of worker tasks fed by an asyncio
+    queue, so message iteration never waits on a download.
+
+    Each job carries the message's extracted record; if the download fails
+    after all retries the record's `image_path` is cleared so the raw zone
+    never points at a missing file. `on_complete`, if given, is called with
+    the record once its photo is settled (downloaded, skipped or failed)
+    and whether this run downloaded it; it may be a coroutine function.
+
+    With an `image_store`, photos are downloaded to a staging path and then
+    filed in the content-addressed store; the record's `image_path` is
+    rewritten to the canonical copy.
+    """
+
+    def __init__(
+        self,
+        workers=4,
+        max_retries=3,
+        max_bytes_in_flight=32 * 1024 * 1024,
+        rate_limiter=None,
+        on_complete=None,
+        image_store=None,
+    ):
+        self.workers = max(1, workers)
+        self.max_retries = max_retries
+        self.max_bytes_in_flight = max_bytes_in_flight
+        self.rate_limiter = rate_limiter
+        self.on_complete = on_complete
+        self.image_store = image_store
+
+        self.queue = asyncio.Queue(maxsize=self.workers * 4)
+        self._bytes_in_flight = 0
+        self._budget = asyncio.Condition()
+        self._tasks = []
+
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def __aenter__(self):
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def submit(self, message, image_path, record, rate_limiter=None):
+        """
+        Queues a photo download. Photos already on disk are skipped; since
+        downloads are renamed into place only once complete, a file at
+        `image_path` is always a whole photo.
+        Blocks only when the queue is full. `rate_limiter` overrides the
+        downloader's own, e.g. with the budget of the session that fetched
+        the message.
+        """
+        image_path = Path(image_path)
+        if self.image_store:
+            stored = self.image_store.lookup(record["channel_name"], record["message_id"])
+            if stored:
+                record["image_path"] = str(stored)
+                self.skipped += 1
+                await self._complete(record, downloaded=False)
+                return
+        elif image_path.exists():
+            self.skipped += 1
+            await self._complete(record, downloaded=False)
+            return
+
+        image_path.parent.mkdir(parents=True, exist_ok=True)
+        await self.queue.put((message, image_path, record, rate_limiter or self.rate_limiter))
+
+    async def _worker(self):
+        while True:
+            message, image_path, record, rate_limiter = await self.queue.get()
+            try:
+                downloaded = await self._download(message, image_path, record, rate_limiter)
+                await self._complete(record, downloaded)
+            finally:
+                self.queue.task_done()
+
+    async def _complete(self, record, downloaded):
+        if self.on_complete:
+            result = self.on_complete(record, downloaded)
+            if asyncio.iscoroutine(result):
+                await result
+
+    async def _download(self, message, image_path, record, rate_limiter):
+        size = getattr(message.file, "size", None) or DEFAULT_MEDIA_SIZE
+        await self._reserve(size)
+        try:
+            attempt = 1
+            while attempt <= self.max_retries:
+                try:
+                    if rate_limiter:
+                        await rate_limiter.acquire()
+                    started = time.perf_counter()
+                    # Download beside the target and rename into place, so an
+                    # interrupted download never looks like a photo on disk.
+                    tmp_path = image_path.with_name(f".{image_path.name}.part")
+                    try:
+                        await message.download_media(file=tmp_path)
+                        os.replace(tmp_path, image_path)
+                    finally:
+                        tmp_path.unlink(missing_ok=True)
+                    self.downloaded += 1
+
+                    metrics = get_metrics()
+                    metrics.download_latency.observe(time.perf_counter() - started)
+                    metrics.downloaded_bytes.inc(
+                        image_path.stat().st_size, channel=record["channel_name"]
+                    )
+                    if self.image_store:
+                        record["image_path"] = str(self.image_store.ingest(
+                            image_path, record["channel_name"], record["message_id"]
+                        ))
+                    return True
+                except FloodWaitError as e:
+                    # Not the file's fault: wait it out without using up a retry.
+                    if rate_limiter:
+                        await rate_limiter.handle_flood_wait(e)
+                    else:
+                        await asyncio.sleep(e.seconds)
+                    continue
+                except Exception as e:
+                    logging.warning(
+                        f"Download of {image_path} failed "
+                        f"(attempt {attempt}/{self.max_retries}): {e}"
+                    )
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(2 ** attempt)
+                    attempt += 1
+
+            self.failed += 1
+            record["image_path"] = None
+            logging.error(f"Giving up on {image_path}")
+            return False
+        finally:
+            await self._release(size)
+
+    async def _reserve(self, size):
+        # A single file larger than the cap is still allowed through alone.
+        async with self._budget:
+            await self._budget.wait_for(
+                lambda: self._bytes_in_flight == 0
+                or self._bytes_in_flight + size <= self.max_bytes_in_flight
+            )
+            self._bytes_in_flight += size
+
+    async def _release(self, size):
+        async with self._budget:
+            self._bytes_in_flight -= size
+            self._budget.notify_all()
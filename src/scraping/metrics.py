@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus style.
+    """
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "max": round(self.max, 6),
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.bucket_counts)},
+        }
+
+    def prometheus_lines(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {count}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class Counter:
+    """
+    Monotonic counter, optionally split by channel.
+    """
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.values = {}
+
+    def inc(self, amount=1, channel=None):
+        self.values[channel] = self.values.get(channel, 0) + amount
+
+    @property
+    def total(self):
+        return sum(self.values.values())
+
+    def as_dict(self):
+        return {"total": self.total, "by_channel": {k: v for k, v in self.values.items() if k}}
+
+    def prometheus_lines(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for channel, value in sorted(self.values.items(), key=lambda kv: kv[0] or ""):
+            label = f'{{channel="{channel}"}}' if channel else ""
+            lines.append(f"{self.name}{label} {value}")
+        return lines
+
+
+class ScrapeMetrics:
+    """
+    Instrumentation for one scraper run: latency histograms, counters and
+    per-channel timings, exportable as a JSON run summary or in the
+    Prometheus text format.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.page_latency = Histogram(
+            "scraper_page_latency_seconds", "Time to fetch one page of channel history"
+        )
+        self.download_latency = Histogram(
+            "scraper_download_latency_seconds", "Time to download one photo"
+        )
+        self.write_latency = Histogram(
+            "scraper_raw_write_latency_seconds",
+            "Time to write one raw message",
+            buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 1),
+        )
+        self.messages = Counter("scraper_messages_total", "Messages written to the raw zone")
+        self.downloaded_bytes = Counter("scraper_downloaded_bytes_total", "Photo bytes downloaded")
+        self.written_bytes = Counter("scraper_raw_written_bytes_total", "Raw-zone bytes written")
+        self.flood_waits = Counter("scraper_flood_waits_total", "FloodWait errors received")
+        self.channels = {}
+
+    def channel_started(self, channel_name):
+        self.channels[channel_name] = {"started_at": time.time()}
+
+    def channel_finished(self, channel_name, **fields):
+        timing = self.channels.setdefault(channel_name, {"started_at": time.time()})
+        timing["seconds"] = round(time.time() - timing["started_at"], 3)
+        timing.update(fields)
+
+    def summary(self, throttle=None):
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "channels": self.channels,
+            "counters": {
+                c.name: c.as_dict()
+                for c in (self.messages, self.downloaded_bytes, self.written_bytes, self.flood_waits)
+            },
+            "histograms": {
+                h.name: h.as_dict()
+                for h in (self.page_latency, self.download_latency, self.write_latency)
+            },
+            "throttle": throttle or {},
+        }
+
+    def write_summary(self, base_path, throttle=None):
+        """
+        Writes the run summary into today's raw-zone date partition.
+        The leading underscore keeps the loader from treating it as data.
+        """
+        output_dir = Path(base_path) / self.started_at.strftime("%Y-%m-%d")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"_run_summary-{self.started_at.strftime('%H%M%S')}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(throttle), f, indent=2)
+        logging.info(f"Run summary written to {path}")
+        return path
+
+    def prometheus_text(self):
+        lines = []
+        for metric in (
+            self.messages, self.downloaded_bytes, self.written_bytes, self.flood_waits,
+            self.page_latency, self.download_latency, self.write_latency,
+        ):
+            lines.extend(metric.prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Writes the text format atomically, e.g. for node_exporter's
+        textfile collector.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def serve_prometheus(self, port):
+        """
+        Serves /metrics on a daemon thread for the lifetime of the run.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logging.info(f"Prometheus metrics served on :{port}/metrics")
+        return server
+
+
+# Process-wide registry, like the logging module's root logger.
+_metrics = ScrapeMetrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def reset_metrics():
+    """
+    Starts a fresh registry (one per run) and returns it.
+    """
+    global _metrics
+    _metrics = ScrapeMetrics()
+    return _metrics
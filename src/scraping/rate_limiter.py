@@ -1,12 +1,132 @@
+import asyncio
 import time
 import logging
 from telethon.errors import FloodWaitError
 
+from src.scraping.metrics import get_metrics
 
-def handle_rate_limit(error: FloodWaitError):
+
+class ThrottleStats:
+    """
+    Counters for time spent throttled, either waiting on the token bucket
+    or sleeping out a Telegram FloodWait. Seconds are summed over every
+    waiting task, so concurrent waiters can add up to more than wall time.
+    """
+
+    def __init__(self):
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0.0
+        self.bucket_waits = 0
+        self.bucket_wait_seconds = 0.0
+
+    @property
+    def throttled_seconds(self):
+        return self.flood_wait_seconds + self.bucket_wait_seconds
+
+    def as_dict(self):
+        return {
+            "flood_waits": self.flood_waits,
+            "flood_wait_seconds": round(self.flood_wait_seconds, 3),
+            "bucket_waits": self.bucket_waits,
+            "bucket_wait_seconds": round(self.bucket_wait_seconds, 3),
+            "throttled_seconds": round(self.throttled_seconds, 3),
+        }
+
+
+class TokenBucket:
+    """
+    Async token bucket: refills at `rate` tokens per second up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens=1):
+        """
+        Waits until `tokens` are available and takes them.
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= tokens
+        return waited
+
+
+class RateLimiter:
+    """
+    The request budget of one Telegram account, shared by every channel and
+    download worker using it: paces requests through a token bucket and
+    sleeps out FloodWaits without blocking the event loop.
+    """
+
+    def __init__(self, requests_per_second=2.0, burst=5):
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.stats = ThrottleStats()
+        self.cooldown_until = 0.0
+
+    @classmethod
+    def from_config(cls, config):
+        scraping_conf = config["scraping"]
+        return cls(
+            requests_per_second=scraping_conf.get("requests_per_second", 2.0),
+            burst=scraping_conf.get("request_burst", 5),
+        )
+
+    def flood_wait_remaining(self):
+        """
+        Seconds left on the current FloodWait, 0 if not flood-waited.
+        """
+        return max(0.0, self.cooldown_until - time.monotonic())
+
+    def mark_flood_wait(self, error: FloodWaitError):
+        """
+        Records a FloodWait without sleeping; later acquires wait it out.
+        """
+        logging.warning(f"Rate limit hit. Cooling down for {error.seconds} seconds.")
+        self.cooldown_until = max(self.cooldown_until, time.monotonic() + error.seconds)
+        self.stats.flood_waits += 1
+        get_metrics().flood_waits.inc()
+
+    async def wait_for_cooldown(self):
+        remaining = self.flood_wait_remaining()
+        if remaining:
+            await asyncio.sleep(remaining)
+            self.stats.flood_wait_seconds += remaining
+
+    async def acquire(self):
+        await self.wait_for_cooldown()
+        waited = await self.bucket.acquire()
+        if waited:
+            self.stats.bucket_waits += 1
+            self.stats.bucket_wait_seconds += waited
+
+    async def handle_flood_wait(self, error: FloodWaitError):
+        self.mark_flood_wait(error)
+        await self.wait_for_cooldown()
+
+
+async def handle_rate_limit(error: FloodWaitError, stats: ThrottleStats = None):
     """
-    Handles Telegram FloodWait errors by sleeping.
+    Handles Telegram FloodWait errors by sleeping without blocking the loop.
     """
     wait_seconds = error.seconds
     logging.warning(f"Rate limit hit. Sleeping for {wait_seconds} seconds.")
-    time.sleep(wait_seconds)
+    await asyncio.sleep(wait_seconds)
+    if stats is not None:
+        stats.flood_waits += 1
+        stats.flood_wait_seconds += wait_seconds
@@ -0,0 +1,122 @@
+import gzip
+import io
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # zstd compression is optional
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {
+    None: "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def new_run_id(now=None):
+    """
+    Run time plus a random suffix, so two writers for the same channel
+    started in the same second never pick the same file name.
+    """
+    now = now or datetime.now()
+    return f"{now.strftime('%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class RawMessageWriter:
+    """
+    Streams messages into the raw zone as newline-delimited JSON.
+
+    Files are written to <base_path>/<YYYY-MM-DD>/ as
+    <channel>-<run id>-<part>.ndjson[.gz|.zst], the run id being the run
+    time plus a random suffix. Each part is written to a hidden temp file
+    and renamed into place once complete, so readers never see a partial
+    file. A new part is started when the current one passes
+    `max_bytes` of uncompressed JSON.
+    """
+
+    def __init__(self, base_path, channel_name, compression=None, max_bytes=64 * 1024 * 1024):
+        if compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unsupported raw compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+
+        now = datetime.now()
+        self.output_dir = Path(base_path) / now.strftime("%Y-%m-%d")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.channel_name = channel_name
+        self.run_id = new_run_id(now)
+        self.compression = compression
+        self.max_bytes = max_bytes
+
+        self.part = 0
+        self.count = 0
+        self.paths = []
+        self._file = None
+        self._tmp_path = None
+        self._final_path = None
+        self._part_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, message):
+        """
+        Appends one message, rotating to a new part when the current is full.
+        """
+        line = json.dumps(message, ensure_ascii=False, default=str) + "\n"
+
+        if self._file is None or self._part_bytes >= self.max_bytes:
+            self._rotate()
+
+        self._file.write(line)
+        self._part_bytes += len(line.encode("utf-8"))
+        self.count += 1
+
+    def close(self):
+        """
+        Finalizes the current part. Returns the paths of all parts written.
+        """
+        self._finalize()
+        return self.paths
+
+    def _rotate(self):
+        self._finalize()
+        self.part += 1
+
+        name = (
+            f"{self.channel_name}-{self.run_id}-{self.part:04d}.ndjson"
+            f"{COMPRESSION_SUFFIXES[self.compression]}"
+        )
+        self._final_path = self.output_dir / name
+        self._tmp_path = self.output_dir / f".{name}.part"
+        self._file = self._open(self._tmp_path)
+        self._part_bytes = 0
+
+    def _open(self, path):
+        if self.compression == "gzip":
+            return gzip.open(path, "wt", encoding="utf-8")
+        if self.compression == "zstd":
+            raw = open(path, "wb")
+            stream = zstandard.ZstdCompressor().stream_writer(raw)
+            return io.TextIOWrapper(stream, encoding="utf-8")
+        return open(path, "w", encoding="utf-8")
+
+    def _finalize(self):
+        if self._file is None:
+            return
+
+        self._file.close()
+        os.replace(self._tmp_path, self._final_path)
+        self.paths.append(self._final_path)
+        logging.info(f"Wrote raw part {self._final_path}")
+        self._file = None
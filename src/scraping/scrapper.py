@@ -1,16 +1,27 @@
+import argparse
 import asyncio
-import json
 import yaml
 import logging
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from telethon.errors import FloodWaitError
 
-from src.scraping.telegram_client import get_telegram_client
+from src.scraping.telegram_client import TelegramClientPool
 from src.scraping.message_scraper import extract_message_data
-from src.scraping.rate_limiter import handle_rate_limit
 from src.scraping.logger import setup_logger
+from src.scraping.media_downloader import MediaDownloader
+from src.scraping.raw_writer import RawMessageWriter
+from src.ingestion.parquet_landing import ParquetMessageWriter
+from src.scraping.state_store import ScrapeStateStore
+from src.scraping.image_store import ImageStore
+from src.scraping.enrichment_queue import EnrichmentQueue
+from src.scraping.metrics import get_metrics, reset_metrics
+
+
+# Telegram returns channel history in pages of this many messages.
+HISTORY_PAGE_SIZE = 100
 
 
 def load_config():
@@ -18,70 +29,376 @@ def load_config():
         return yaml.safe_load(f)
 
 
-def save_raw_messages(messages, base_path, channel_name):
+def open_raw_writer(storage_conf, channel_name):
+    """
+    Returns the raw-zone writer for the configured storage.raw_format
+    ("ndjson" by default, or "parquet").
+    """
+    if storage_conf.get("raw_format", "ndjson") == "parquet":
+        return ParquetMessageWriter(storage_conf["raw_data_path"], channel_name)
+    return RawMessageWriter(
+        storage_conf["raw_data_path"],
+        channel_name,
+        compression=storage_conf.get("raw_compression"),
+        max_bytes=storage_conf.get("raw_max_file_bytes", 64 * 1024 * 1024),
+    )
+
+
+def build_iter_params(channel_name, config, state_store):
+    """
+    Works out how far back to read a channel.
+
+    Returns (fetch kwargs, refresh kwargs, last_message_id, backfill
+    cutoff) for `iter_messages`. A channel without a high-water mark gets
+    its newest `fetch_limit` messages. Once it has one, messages above the
+    mark are read oldest-first via `min_id` and `reverse`, so a run cut
+    short by the limit or a FloodWait still covers a contiguous range and
+    the mark can advance to its newest message. With a backfill window,
+    refresh kwargs re-read the posts just below the mark newest-first (via
+    `max_id`) until they are older than the cutoff date, so the most
+    recent posts, whose view and forward counts change most, are always
+    refreshed; they never move the mark. Refresh kwargs and cutoff are
+    None without a backfill window.
+    """
+    fetch_limit = config["scraping"]["fetch_limit"]
+    last_message_id = state_store.last_message_id(channel_name) if state_store else 0
+    backfill_days = config["scraping"].get("backfill_days", 0)
+
+    if not last_message_id:
+        return {"limit": fetch_limit}, None, 0, None
+
+    fetch_kwargs = {"limit": fetch_limit, "min_id": last_message_id, "reverse": True}
+    refresh_kwargs, backfill_cutoff = None, None
+    if backfill_days:
+        refresh_kwargs = {"limit": fetch_limit, "max_id": last_message_id + 1}
+        backfill_cutoff = datetime.now(timezone.utc) - timedelta(days=backfill_days)
+    return fetch_kwargs, refresh_kwargs, last_message_id, backfill_cutoff
+
+
+async def iter_messages_resumable(pool, channel_name, channel_url, iter_kwargs, max_resumes):
     """
-    Saves raw messages as JSON in a date-partitioned folder.
+    Yields (session, message) pairs like `client.iter_messages`, taking a
+    token from the session's rate budget per history page. On a FloodWait
+    the session is put on cooldown and iteration resumes from the last
+    message id seen, on another session if one is free or after sleeping
+    (without blocking the loop) otherwise, up to `max_resumes` times.
     """
-    date_partition = datetime.now().strftime("%Y-%m-%d")
-    output_dir = Path(base_path) / date_partition
-    output_dir.mkdir(parents=True, exist_ok=True)
+    limit = iter_kwargs.get("limit")
+    fetched = 0
+    offset_id = 0
+    resumes = 0
+    page_latency = get_metrics().page_latency
 
-    file_path = output_dir / f"{channel_name}.json"
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(messages, f, ensure_ascii=False, indent=2)
+    while True:
+        kwargs = dict(iter_kwargs, offset_id=offset_id)
+        if limit is not None:
+            kwargs["limit"] = limit - fetched
+            if kwargs["limit"] <= 0:
+                return
 
+        session = pool.acquire(channel_name)
+        # Pages restart with every iter_messages call, so page boundaries
+        # are counted per call; `fetched` is the total across resumes.
+        in_call = 0
+        try:
+            await session.rate_limiter.acquire()
+            page_started = time.perf_counter()
+            async for message in session.client.iter_messages(channel_url, **kwargs):
+                fetched += 1
+                in_call += 1
+                offset_id = message.id
+                # The first message of a page arrives once the page request
+                # returns; time excludes rate-limit waits and consumer work.
+                if in_call % HISTORY_PAGE_SIZE == 1:
+                    page_latency.observe(time.perf_counter() - page_started)
+                if in_call % HISTORY_PAGE_SIZE == 0:
+                    await session.rate_limiter.acquire()
+                yield session, message
+                if in_call % HISTORY_PAGE_SIZE == 0:
+                    page_started = time.perf_counter()
+            return
+        except FloodWaitError as e:
+            resumes += 1
+            if resumes > max_resumes:
+                raise
+            session.rate_limiter.mark_flood_wait(e)
+            logging.info(f"Resuming {channel_url} after message {offset_id}")
 
-async def scrape_channel(client, channel, config):
+
+async def scrape_channel(
+    pool, channel, config, state_store=None, image_store=None, enrichment_queue=None
+):
+    """
+    Scrapes a single channel, streaming its messages to the raw zone as
+    they arrive. When a state store is given only new messages (plus the
+    configured backfill window) are fetched. On a FloodWait the scrape
+    resumes where it stopped, moving to another pooled session when one is
+    free. With an image store, photos are deduplicated into it and messages
+    reference the canonical copy. With an enrichment queue, every downloaded
+    photo is queued for the streaming detection worker, and new downloads
+    wait while the worker is too far behind. Returns the number of messages
+    saved.
+    """
     channel_name = channel["name"]
     channel_url = channel["url"]
 
-    logging.info(f"Starting scrape for channel: {channel_name}")
-    messages_data = []
-
-    try:
-        async for message in client.iter_messages(
-            channel_url,
-            limit=config["scraping"]["fetch_limit"]
-        ):
-            image_path = None
+    fetch_kwargs, refresh_kwargs, last_message_id, backfill_cutoff = build_iter_params(
+        channel_name, config, state_store
+    )
+    # (iter_messages kwargs, whether the pass may advance the mark, date to stop at)
+    passes = [(fetch_kwargs, True, None)]
+    if refresh_kwargs:
+        passes.append((refresh_kwargs, False, backfill_cutoff))
 
-            if message.photo and config["scraping"]["download_images"]:
-                image_dir = Path(config["storage"]["image_path"]) / channel_name
-                image_dir.mkdir(parents=True, exist_ok=True)
+    logging.info(
+        f"Starting scrape for channel: {channel_name} "
+        f"(after message {last_message_id})"
+    )
+    completed = True
+    newest_id, newest_date = 0, None
+    scraping_conf = config["scraping"]
+    storage_conf = config["storage"]
+    enrichment_conf = config.get("enrichment", {})
+    max_pending = enrichment_conf.get("max_pending", 1000)
+    max_pending_wait = enrichment_conf.get("max_wait_seconds", 300)
+    image_dir = Path(storage_conf["image_path"]) / channel_name
 
-                image_path = image_dir / f"{message.id}.jpg"
-                await message.download_media(file=image_path)
+    metrics = get_metrics()
+    metrics.channel_started(channel_name)
+    writer = open_raw_writer(storage_conf, channel_name)
 
-            messages_data.append(
-                extract_message_data(
-                    message=message,
-                    channel_name=channel_name,
-                    image_path=str(image_path) if image_path else None,
-                )
+    async def write_record(record, downloaded=False):
+        started = time.perf_counter()
+        writer.write(record)
+        metrics.write_latency.observe(time.perf_counter() - started)
+        metrics.messages.inc(channel=channel_name)
+        # photos already on disk were queued when they were downloaded
+        if enrichment_queue and downloaded and record.get("image_path"):
+            await enrichment_queue.put_async(
+                channel_name, record["message_id"], record["image_path"]
             )
 
-    except FloodWaitError as e:
-        handle_rate_limit(e)
+    downloader = MediaDownloader(
+        workers=scraping_conf.get("download_workers", 4),
+        max_retries=scraping_conf.get("download_retries", 3),
+        max_bytes_in_flight=scraping_conf.get(
+            "max_download_bytes_in_flight", 32 * 1024 * 1024
+        ),
+        on_complete=write_record,
+        image_store=image_store,
+    )
 
-    save_raw_messages(
-        messages_data,
-        config["storage"]["raw_data_path"],
+    with writer:
+        async with downloader:
+            try:
+                for iter_kwargs, advances_mark, stop_before in passes:
+                    async for session, message in iter_messages_resumable(
+                        pool,
+                        channel_name,
+                        channel_url,
+                        iter_kwargs,
+                        scraping_conf.get("max_flood_wait_resumes", 5),
+                    ):
+                        if stop_before and message.date < stop_before:
+                            break
+
+                        image_path = None
+                        if message.photo and scraping_conf["download_images"]:
+                            if image_store:
+                                image_path = image_store.staging_path(channel_name, message.id)
+                            else:
+                                image_path = image_dir / f"{message.id}.jpg"
+
+                        record = extract_message_data(
+                            message=message,
+                            channel_name=channel_name,
+                            image_path=str(image_path) if image_path else None,
+                        )
+                        if advances_mark and message.id > newest_id:
+                            newest_id, newest_date = message.id, record["message_date"]
+
+                        # Photo messages are written once their download settles.
+                        if image_path:
+                            if enrichment_queue:
+                                await enrichment_queue.wait_for_room(
+                                    max_pending, max_pending_wait
+                                )
+                            await downloader.submit(
+                                message, image_path, record, session.rate_limiter
+                            )
+                        else:
+                            await write_record(record)
+
+            except FloodWaitError as e:
+                completed = False
+                logging.error(
+                    f"Giving up on {channel_name} after repeated FloodWaits "
+                    f"({e.seconds}s); keeping what was fetched"
+                )
+
+    logging.info(
+        f"Media for {channel_name}: {downloader.downloaded} downloaded, "
+        f"{downloader.skipped} already on disk, {downloader.failed} failed"
+    )
+    metrics.written_bytes.inc(
+        sum(path.stat().st_size for path in writer.paths), channel=channel_name
+    )
+    metrics.channel_finished(
         channel_name,
+        messages=writer.count,
+        images_downloaded=downloader.downloaded,
+        images_skipped=downloader.skipped,
+        images_failed=downloader.failed,
+        completed=completed,
     )
 
+    # Above an existing mark messages arrive oldest-first, so everything up
+    # to the newest one seen is on disk even if the scrape stopped early. A
+    # first scrape runs newest-first and only sets the mark once complete.
+    if state_store and newest_id and (completed or last_message_id):
+        state_store.update(channel_name, newest_id, newest_date)
+
     logging.info(f"Finished scrape for channel: {channel_name}")
+    return writer.count
+
+
+async def scrape_channels_concurrently(
+    pool, channels, config, max_concurrency, state_store=None, image_store=None,
+    enrichment_queue=None,
+):
+    """
+    Scrapes channels as asyncio tasks over the shared client pool, with at most
+    `max_concurrency` channels in flight. A failing channel does not cancel
+    the others; its exception is returned in its result instead.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(channel):
+        async with semaphore:
+            return await scrape_channel(
+                pool, channel, config, state_store, image_store, enrichment_queue
+            )
+
+    outcomes = await asyncio.gather(
+        *(run(channel) for channel in channels),
+        return_exceptions=True,
+    )
+    return dict(zip((channel["name"] for channel in channels), outcomes))
+
+
+async def scrape_channels_serially(
+    pool, channels, config, state_store=None, image_store=None, enrichment_queue=None
+):
+    """
+    Scrapes channels one after another. Used as a fallback for the
+    concurrent mode; results have the same shape.
+    """
+    results = {}
+    for channel in channels:
+        try:
+            results[channel["name"]] = await scrape_channel(
+                pool, channel, config, state_store, image_store, enrichment_queue
+            )
+        except Exception as e:
+            results[channel["name"]] = e
+    return results
 
 
-async def main():
+def log_channel_results(results):
+    """
+    Logs a per-channel summary and returns the names of failed channels.
+    """
+    failed = []
+    for channel_name, outcome in results.items():
+        if isinstance(outcome, BaseException):
+            logging.error(f"Channel {channel_name} failed: {outcome!r}")
+            failed.append(channel_name)
+        else:
+            logging.info(f"Channel {channel_name} saved {outcome} messages")
+    return failed
+
+
+async def main(serial=None, max_concurrency=None):
     config = load_config()
     setup_logger(config["logging"]["log_path"])
+    metrics = reset_metrics()
+    metrics_conf = config.get("metrics", {})
+    if metrics_conf.get("prometheus_port"):
+        metrics.serve_prometheus(metrics_conf["prometheus_port"])
 
-    client = get_telegram_client()
+    scraping_conf = config["scraping"]
+    if serial is None:
+        serial = not scraping_conf.get("concurrent", True)
+    if max_concurrency is None:
+        max_concurrency = scraping_conf.get("max_concurrent_channels", 4)
 
-    async with client:
-        for channel in config["telegram"]["channels"]:
-            await scrape_channel(client, channel, config)
+    channels = config["telegram"]["channels"]
+    state_store = ScrapeStateStore(
+        config["storage"].get("state_path", "data/state/scrape_state.json")
+    )
+    image_store = None
+    if config["storage"].get("dedupe_images"):
+        image_store = ImageStore(config["storage"]["image_path"])
+    enrichment_queue = None
+    enrichment_conf = config.get("enrichment", {})
+    if enrichment_conf.get("streaming"):
+        enrichment_queue = EnrichmentQueue(
+            enrichment_conf.get("queue_path", "data/state/enrichment_queue.sqlite")
+        )
+    pool = TelegramClientPool.from_env(config)
+
+    async with pool:
+        if serial:
+            results = await scrape_channels_serially(
+                pool, channels, config, state_store, image_store, enrichment_queue
+            )
+        else:
+            results = await scrape_channels_concurrently(
+                pool, channels, config, max_concurrency, state_store, image_store,
+                enrichment_queue,
+            )
+
+    if image_store:
+        logging.info(
+            f"Image dedupe: {image_store.exact_duplicates} exact and "
+            f"{image_store.near_duplicates} near duplicates discarded"
+        )
+        image_store.close()
+    if enrichment_queue:
+        logging.info(f"Enrichment queue depth: {enrichment_queue.depth()}")
+        enrichment_queue.close()
+
+    throttle = pool.stats.as_dict()
+    logging.info(f"Throttling: {throttle}")
+    metrics.write_summary(config["storage"]["raw_data_path"], throttle)
+    if metrics_conf.get("prometheus_file"):
+        metrics.write_prometheus(metrics_conf["prometheus_file"])
+
+    failed = log_channel_results(results)
+    if failed:
+        logging.warning(f"{len(failed)} of {len(channels)} channels failed: {failed}")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape configured Telegram channels")
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        default=None,
+        help="Scrape channels one at a time instead of concurrently",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of channels scraped at once (overrides config)",
+    )
+    # Unknown flags (e.g. the CI's --dry-run) are ignored rather than rejected.
+    args, _ = parser.parse_known_args()
+    return args
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(main(serial=args.serial, max_concurrency=args.max_concurrency))
@@ -0,0 +1,54 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+
+class ScrapeStateStore:
+    """
+    Persists per-channel high-water marks (last scraped message id and date)
+    so each run only fetches messages newer than the previous one.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._state = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._state = json.load(f)
+
+    def get(self, channel_name):
+        """
+        Returns {"last_message_id", "last_message_date"} for a channel,
+        or None if the channel has never been scraped.
+        """
+        return self._state.get(channel_name)
+
+    def last_message_id(self, channel_name):
+        state = self.get(channel_name)
+        return state["last_message_id"] if state else 0
+
+    def update(self, channel_name, last_message_id, last_message_date):
+        """
+        Advances a channel's high-water mark and persists the store.
+        Marks never move backwards.
+        """
+        if last_message_id <= self.last_message_id(channel_name):
+            return
+
+        self._state[channel_name] = {
+            "last_message_id": last_message_id,
+            "last_message_date": last_message_date,
+        }
+        self.save()
+        logging.info(f"High-water mark for {channel_name} advanced to {last_message_id}")
+
+    def save(self):
+        """
+        Writes the store atomically (temp file then rename).
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
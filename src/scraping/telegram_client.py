@@ -1,8 +1,13 @@
 
 import os
+import hashlib
+import logging
+from contextlib import AsyncExitStack
 from telethon import TelegramClient
 from dotenv import load_dotenv
 
+from src.scraping.rate_limiter import RateLimiter, ThrottleStats
+
 load_dotenv()
 
 def get_telegram_client():
@@ -11,3 +16,115 @@ def get_telegram_client():
     session_name = os.getenv("SESSION_NAME", "telegram_scraper_session")
     
     return TelegramClient(session_name, api_id, api_hash)
+
+
+def load_session_credentials():
+    """
+    Reads numbered credentials (API_ID_1/API_HASH_1/SESSION_NAME_1,
+    API_ID_2/...) from the environment. Falls back to the single
+    API_ID/API_HASH/SESSION_NAME set when no numbered ones exist.
+    """
+    credentials = []
+    index = 1
+    while os.getenv(f"API_ID_{index}"):
+        credentials.append({
+            "api_id": int(os.getenv(f"API_ID_{index}")),
+            "api_hash": os.getenv(f"API_HASH_{index}"),
+            "session_name": os.getenv(
+                f"SESSION_NAME_{index}", f"telegram_scraper_session_{index}"
+            ),
+        })
+        index += 1
+    return credentials
+
+
+class PooledSession:
+    """
+    One Telegram account in the pool, with its own rate budget.
+    """
+
+    def __init__(self, name, client, rate_limiter):
+        self.name = name
+        self.client = client
+        self.rate_limiter = rate_limiter
+
+
+class TelegramClientPool:
+    """
+    Spreads channels across several Telegram accounts.
+
+    Each channel is assigned to a session by a stable hash of its name. When
+    that session is flood-waited the channel moves to the next available
+    session in ring order; only when every session is cooling down does a
+    caller wait (inside the rate limiter's acquire).
+    """
+
+    def __init__(self, sessions):
+        if not sessions:
+            raise ValueError("TelegramClientPool needs at least one session")
+        self.sessions = sessions
+        self._stack = None
+
+    @classmethod
+    def from_env(cls, config):
+        credentials = load_session_credentials()
+        if not credentials:
+            return cls.single(get_telegram_client(), RateLimiter.from_config(config))
+
+        return cls([
+            PooledSession(
+                cred["session_name"],
+                TelegramClient(cred["session_name"], cred["api_id"], cred["api_hash"]),
+                RateLimiter.from_config(config),
+            )
+            for cred in credentials
+        ])
+
+    @classmethod
+    def single(cls, client, rate_limiter):
+        return cls([PooledSession("default", client, rate_limiter)])
+
+    async def __aenter__(self):
+        self._stack = AsyncExitStack()
+        for session in self.sessions:
+            await self._stack.enter_async_context(session.client)
+        logging.info(f"Telegram client pool started with {len(self.sessions)} session(s)")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._stack.aclose()
+
+    def home_session(self, channel_name):
+        digest = hashlib.sha1(channel_name.encode("utf-8")).hexdigest()
+        return int(digest, 16) % len(self.sessions)
+
+    def acquire(self, channel_name):
+        """
+        Returns the session a channel should use right now.
+        """
+        start = self.home_session(channel_name)
+        ring = self.sessions[start:] + self.sessions[:start]
+
+        for session in ring:
+            if not session.rate_limiter.flood_wait_remaining():
+                if session is not ring[0]:
+                    logging.info(
+                        f"Reassigning {channel_name} from {ring[0].name} to {session.name}"
+                    )
+                return session
+
+        return min(ring, key=lambda session: session.rate_limiter.flood_wait_remaining())
+
+    @property
+    def stats(self):
+        """
+        Throttle counters summed over all sessions.
+        """
+        total = ThrottleStats()
+        for session in self.sessions:
+            stats = session.rate_limiter.stats
+            total.flood_waits += stats.flood_waits
+            total.flood_wait_seconds += stats.flood_wait_seconds
+            total.bucket_waits += stats.bucket_waits
+            total.bucket_wait_seconds += stats.bucket_wait_seconds
+        return total
@@ -4,17 +4,41 @@ YOLO Image Detection Module
 Processes raw images from Telegram channels using YOLOv8, classifies images
 into categories, and saves detection results to a CSV file.
 
-Outputs:
-- CSV file with per-image and per-object detection results
+Images are decoded and letterboxed by a bounded thread pool ahead of
+inference and passed to the model in batches (YOLO_BATCH_SIZE). Results are
+cached per image content hash and model version, so re-runs only send new
+images to the model. With YOLO_WORKERS > 1 the image set is split into
+shards, one worker process each, and the partial outputs are merged.
+YOLO_BACKEND=onnx (or onnx-int8) runs an exported ONNX model through ONNX
+Runtime instead of PyTorch.
+
+Outputs (YOLO_OUTPUT_FORMAT):
+- postgres (default): bulk-loaded into raw.yolo_detections (per object) and
+  raw.yolo_image_summary (per message image, with its category)
+- csv: CSV file with per-image and per-object detection results
+- parquet: Parquet landing files partitioned by date and channel
 """
 
 import os
 import csv
-from typing import List
+import time
+import logging
+import zlib
+import shutil
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
 from ultralytics import YOLO
-from scrapping.logger import get_logger
+from src.detection_cache import DetectionCache, image_sha256, model_version
+from src.ingestion.parquet_landing import write_detections_parquet
+from src.yolo_onnx import OnnxDetector, export_onnx
+from src.scraping.image_store import ImageStore
 
-logger = get_logger(__name__)
+logger = logging.getLogger(__name__)
 
 # -------------------------------
 # CONFIG
@@ -22,7 +46,28 @@ logger = get_logger(__name__)
 RAW_IMAGE_DIR = "data/raw/images"
 ENRICHED_DIR = "data/enriched"
 OUTPUT_CSV = os.path.join(ENRICHED_DIR, "yolo_detections.csv")
-YOLO_MODEL = "yolov8n.pt"  # nano model for efficiency
+IMAGE_INDEX = os.path.join(RAW_IMAGE_DIR, "image_index.sqlite")  # content-addressed store
+PARQUET_DIR = os.path.join(ENRICHED_DIR, "yolo_detections")
+DETECTION_CACHE = os.path.join(ENRICHED_DIR, "detection_cache.sqlite")
+OUTPUT_FORMAT = os.getenv("YOLO_OUTPUT_FORMAT", "postgres")  # "postgres", "csv" or "parquet"
+YOLO_MODEL = os.getenv("YOLO_MODEL", "yolov8n.pt")  # nano model for efficiency
+BACKEND = os.getenv("YOLO_BACKEND", "torch")  # "torch", "onnx" or "onnx-int8"
+ORT_THREADS = int(os.getenv("YOLO_ORT_THREADS", str(os.cpu_count() or 1)))
+IMAGE_SIZE = 640  # model input size; images are letterboxed to it
+BATCH_SIZE = int(os.getenv("YOLO_BATCH_SIZE", "16"))
+DECODE_WORKERS = int(os.getenv("YOLO_DECODE_WORKERS", "4"))
+WORKERS = int(os.getenv("YOLO_WORKERS", "1"))  # >1 enables sharded processes
+SHARD_RETRIES = int(os.getenv("YOLO_SHARD_RETRIES", "1"))
+SHARD_DIR = os.path.join(ENRICHED_DIR, "yolo_shards")
+
+CSV_HEADERS = [
+    "message_id",
+    "channel_name",
+    "image_path",
+    "detected_class",
+    "confidence_score",
+    "image_category",
+]
 
 
 # -------------------------------
@@ -62,92 +107,450 @@ def classify_image(detected_classes: List[str]) -> str:
         return "other"
 
 
+def iter_image_jobs() -> Iterator[Tuple[str, List[Tuple[str, str]]]]:
+    """
+    Yield (image_path, refs) for every image that needs detection, where refs
+    lists the (channel_name, message_id) pairs the image belongs to.
+
+    Images in the scraper's content-addressed store are yielded once with
+    every message that references them; images in per-channel folders
+    belong to the single message named by the file.
+    """
+    if os.path.exists(IMAGE_INDEX):
+        store = ImageStore(RAW_IMAGE_DIR)
+        try:
+            for image_path, refs in store.unique_images():
+                yield str(image_path), [(channel, str(msg_id)) for channel, msg_id in refs]
+        finally:
+            store.close()
+
+    for channel_name in sorted(os.listdir(RAW_IMAGE_DIR)):
+        channel_folder = os.path.join(RAW_IMAGE_DIR, channel_name)
+        if not os.path.isdir(channel_folder) or channel_name in ("objects", "staging"):
+            continue
+
+        for image_file in sorted(os.listdir(channel_folder)):
+            if not image_file.lower().endswith((".jpg", ".jpeg", ".png")):
+                continue
+
+            image_path = os.path.join(channel_folder, image_file)
+            yield image_path, [(channel_name, os.path.splitext(image_file)[0])]
+
+
+def detection_rows(
+    image_path: str,
+    refs: List[Tuple[str, str]],
+    detections: List[Tuple[str, float]],
+) -> List[Dict]:
+    """
+    Build output rows for one image: one row per detected object for each
+    message that references the image, or a single "none" row per message
+    carrying the image category when nothing was detected.
+    """
+    image_category = classify_image([cls for cls, _ in detections])
+    rows = []
+
+    for channel_name, msg_id in refs:
+        message_id = f"{channel_name}_{msg_id}"
+        for cls, conf in detections:
+            rows.append({
+                "message_id": message_id,
+                "channel_name": channel_name,
+                "image_path": image_path,
+                "detected_class": cls,
+                "confidence_score": conf,
+                "image_category": "",  # placeholder
+            })
+
+        if not detections:
+            rows.append({
+                "message_id": message_id,
+                "channel_name": channel_name,
+                "image_path": image_path,
+                "detected_class": "none",
+                "confidence_score": 0.0,
+                "image_category": image_category,
+            })
+
+    return rows
+
+
+# -------------------------------
+# BATCHED INFERENCE
+# -------------------------------
+def letterbox(image: np.ndarray, size: int = IMAGE_SIZE) -> np.ndarray:
+    """Resize keeping aspect ratio and pad to a size x size square (YOLO grey)."""
+    height, width = image.shape[:2]
+    scale = size / max(height, width)
+    new_w, new_h = round(width * scale), round(height * scale)
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    top = (size - new_h) // 2
+    left = (size - new_w) // 2
+    return cv2.copyMakeBorder(
+        resized, top, size - new_h - top, left, size - new_w - left,
+        cv2.BORDER_CONSTANT, value=(114, 114, 114),
+    )
+
+
+def load_image(image_path: str) -> Optional[np.ndarray]:
+    """Decode and letterbox one image; None if it cannot be read."""
+    image = cv2.imread(image_path)
+    if image is None:
+        logger.warning(f"Could not decode image: {image_path}")
+        return None
+    return letterbox(image)
+
+
+def iter_decoded_batches(
+    jobs: Iterator[tuple],
+    batch_size: int = BATCH_SIZE,
+    workers: int = DECODE_WORKERS,
+) -> Iterator[List[tuple]]:
+    """
+    Decode images on a thread pool while the caller runs inference, keeping
+    at most two batches of decodes in flight, and yield them in batches.
+
+    Each job is a tuple whose first item is the image path; it is yielded
+    back with the decoded image appended.
+    """
+    max_in_flight = batch_size * 2
+    in_flight: deque = deque()
+    batch = []
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        jobs = iter(jobs)
+        while True:
+            while len(in_flight) < max_in_flight:
+                job = next(jobs, None)
+                if job is None:
+                    break
+                in_flight.append((job, executor.submit(load_image, job[0])))
+
+            if not in_flight:
+                break
+
+            job, future = in_flight.popleft()
+            image = future.result()
+            if image is None:
+                continue
+
+            batch.append((*job, image))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+def load_model(backend: str = BACKEND, threads: Optional[int] = None):
+    """Load the detector for a backend; ONNX exports are cached after the first run."""
+    if backend == "torch":
+        return YOLO(YOLO_MODEL)
+    if backend in ("onnx", "onnx-int8"):
+        onnx_path = export_onnx(YOLO_MODEL, IMAGE_SIZE, quantize=backend == "onnx-int8")
+        return OnnxDetector(onnx_path, threads=threads or ORT_THREADS)
+    raise ValueError(f"Unknown YOLO_BACKEND: {backend}")
+
+
+def detect_batch(model, images: List[np.ndarray]) -> List[List[Tuple[str, float]]]:
+    """Run the model on a batch and return (class, confidence) pairs per image."""
+    if isinstance(model, OnnxDetector):
+        return model.detect(images)
+
+    results = model(images, imgsz=IMAGE_SIZE, verbose=False)
+    return [
+        [(model.names[int(box.cls)], float(box.conf)) for box in r.boxes]
+        for r in results
+    ]
+
+
+def in_shard(image_path: str, shard_index: int, shard_count: int) -> bool:
+    """Stable assignment of an image to one of shard_count shards."""
+    return zlib.crc32(image_path.encode("utf-8")) % shard_count == shard_index
+
+
+def row_emitter(write_row):
+    """Adapt a per-row writer (CSV, Parquet buffer) to per-image results."""
+    def emit(image_path, refs, detections):
+        for row in detection_rows(image_path, refs, detections):
+            write_row(row)
+    return emit
+
+
+def loader_emitter(loader):
+    """Send per-image results, with their category, to a DetectionLoader."""
+    def emit(image_path, refs, detections):
+        loader.add(image_path, refs, detections, classify_image([cls for cls, _ in detections]))
+    return emit
+
+
+def iter_uncached_jobs(
+    cache: DetectionCache, emit, shard_index: int = 0, shard_count: int = 1
+) -> Iterator[Tuple[str, List[Tuple[str, str]], str]]:
+    """
+    Emit results for images already in the detection cache and yield
+    (image_path, refs, sha256) for the ones the model still has to see.
+    """
+    for image_path, refs in iter_image_jobs():
+        if shard_count > 1 and not in_shard(image_path, shard_index, shard_count):
+            continue
+
+        try:
+            sha256 = image_sha256(image_path)
+        except OSError as e:
+            logger.warning(f"Could not hash image {image_path}: {e}")
+            continue
+
+        detections = cache.get(sha256)
+        if detections is None:
+            yield image_path, refs, sha256
+            continue
+
+        emit(image_path, refs, detections)
+
+
 # -------------------------------
 # MAIN DETECTION LOGIC
 # -------------------------------
-def main() -> None:
-    """Run YOLO detection on all images and save results to CSV."""
-    ensure_folder(ENRICHED_DIR)
+def run_detection(model, emit, flush=None, shard_index: int = 0, shard_count: int = 1) -> None:
+    """
+    Emit (image_path, refs, detections) for every image (or every image in
+    one shard), serving cached images from the detection cache and batching
+    the rest through the model.
+    """
+    cache = DetectionCache(DETECTION_CACHE, current_model_key())
+    started = time.perf_counter()
+    image_count = 0
 
     try:
-        model = YOLO(YOLO_MODEL)
-        logger.info(f"Loaded YOLO model: {YOLO_MODEL}")
+        jobs = iter_uncached_jobs(cache, emit, shard_index, shard_count)
+        for batch in iter_decoded_batches(jobs):
+            try:
+                batch_detections = detect_batch(model, [image for *_, image in batch])
+            except Exception as e:
+                logger.warning(
+                    f"YOLO failed on a batch of {len(batch)} images, retrying one by one: {e}"
+                )
+                batch_detections = []
+                for image_path, *_, image in batch:
+                    try:
+                        batch_detections.extend(detect_batch(model, [image]))
+                    except Exception:
+                        logger.exception(f"YOLO failed on {image_path}")
+                        batch_detections.append(None)
+
+            fresh = []
+            for (image_path, refs, sha256, _), detections in zip(batch, batch_detections):
+                if detections is None:
+                    continue
+                emit(image_path, refs, detections)
+                fresh.append((sha256, detections))
+                image_count += 1
+            cache.put_many(fresh)
+
+            if flush:
+                flush()
+    finally:
+        cache.close()
+
+    elapsed = time.perf_counter() - started
+    shard = f"Shard {shard_index + 1}/{shard_count}: " if shard_count > 1 else ""
+    logger.info(
+        f"{shard}Processed {image_count} images in {elapsed:.1f}s "
+        f"({image_count / elapsed if elapsed else 0:.1f} images/sec, "
+        f"batch size {BATCH_SIZE}); {cache.hits} images served from cache"
+    )
+
+
+def current_model_key() -> str:
+    return model_version(YOLO_MODEL, IMAGE_SIZE, BACKEND)
+
+
+def postgres_loader():
+    # imported lazily: file outputs don't need the database configuration
+    from src.ingestion.load_yolo_detections import DetectionLoader
+
+    return DetectionLoader(model_key=current_model_key())
+
+
+def run_single_process() -> None:
+    """Stream detections for all images straight into the output."""
+    try:
+        model = load_model()
+        logger.info(f"Loaded YOLO model: {YOLO_MODEL} ({BACKEND} backend)")
     except Exception as e:
         logger.exception(f"Failed to load YOLO model: {YOLO_MODEL}")
         return
 
-    csv_headers = [
-        "message_id",
-        "channel_name",
-        "image_path",
-        "detected_class",
-        "confidence_score",
-        "image_category",
-    ]
+    parquet_rows: List[dict] = []
 
-    try:
-        with open(OUTPUT_CSV, mode="w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=csv_headers)
+    with contextlib.ExitStack() as stack:
+        csvfile = None
+        if OUTPUT_FORMAT == "postgres":
+            emit = loader_emitter(stack.enter_context(postgres_loader()))
+        elif OUTPUT_FORMAT == "parquet":
+            emit = row_emitter(parquet_rows.append)
+        else:
+            csvfile = stack.enter_context(
+                open(OUTPUT_CSV, mode="w", newline="", encoding="utf-8")
+            )
+            writer = csv.DictWriter(csvfile, fieldnames=CSV_HEADERS)
             writer.writeheader()
+            emit = row_emitter(writer.writerow)
 
-            if not os.path.exists(RAW_IMAGE_DIR):
-                logger.warning(f"No raw images found at {RAW_IMAGE_DIR}")
-                return
+        run_detection(model, emit, flush=csvfile.flush if csvfile else None)
 
-            for channel_name in os.listdir(RAW_IMAGE_DIR):
-                channel_folder = os.path.join(RAW_IMAGE_DIR, channel_name)
-                if not os.path.isdir(channel_folder):
-                    continue
+    if OUTPUT_FORMAT == "parquet":
+        write_detections_parquet(parquet_rows, PARQUET_DIR)
 
-                for image_file in os.listdir(channel_folder):
-                    if not image_file.lower().endswith((".jpg", ".jpeg", ".png")):
-                        continue
 
-                    image_path = os.path.join(channel_folder, image_file)
-                    message_id = f"{channel_name}_{os.path.splitext(image_file)[0]}"
+# -------------------------------
+# SHARDED EXECUTION
+# -------------------------------
+def shard_path(shard_index: int, shard_count: int) -> str:
+    return os.path.join(SHARD_DIR, f"shard-{shard_index:03d}-of-{shard_count:03d}.csv")
+
+
+def limit_threads(threads: int) -> None:
+    """Cap the intra-op threads of one worker so shards don't oversubscribe cores."""
+    import torch
+
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(1)
 
-                    try:
-                        results = model(image_path)
-                    except Exception as e:
-                        logger.exception(f"YOLO failed on {image_path}")
-                        continue
-
-                    detected_classes: List[str] = []
-
-                    for r in results:
-                        for box in r.boxes:
-                            cls = model.names[int(box.cls)]
-                            conf = float(box.conf)
-                            detected_classes.append(cls)
-                            writer.writerow({
-                                "message_id": message_id,
-                                "channel_name": channel_name,
-                                "image_path": image_path,
-                                "detected_class": cls,
-                                "confidence_score": conf,
-                                "image_category": "",  # placeholder
-                            })
-
-                    image_category = classify_image(detected_classes)
-
-                    if not detected_classes:
-                        writer.writerow({
-                            "message_id": message_id,
-                            "channel_name": channel_name,
-                            "image_path": image_path,
-                            "detected_class": "none",
-                            "confidence_score": 0.0,
-                            "image_category": image_category,
-                        })
-
-                    csvfile.flush()
 
+def detect_shard(shard_index: int, shard_count: int, threads: int) -> str:
+    """
+    Worker entry point: load the model once and write one shard's rows to a
+    partial CSV (or load them into Postgres, leaving an empty partial as the
+    completion marker). A shard whose partial output already exists is
+    skipped, so re-running after a failure only repeats the missing shards.
+    """
+    path = shard_path(shard_index, shard_count)
+    if os.path.exists(path):
+        logger.info(f"Shard {shard_index + 1}/{shard_count} already complete, skipping")
+        return path
+
+    limit_threads(threads)
+    model = load_model(threads=threads)
+
+    tmp_path = f"{path}.part"
+    with open(tmp_path, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+        writer.writeheader()
+        if OUTPUT_FORMAT == "postgres":
+            with postgres_loader() as loader:
+                run_detection(model, loader_emitter(loader), None, shard_index, shard_count)
+        else:
+            run_detection(model, row_emitter(writer.writerow), f.flush, shard_index, shard_count)
+    os.replace(tmp_path, path)
+    return path
+
+
+def run_shards(shard_count: int) -> List[str]:
+    """
+    Run every shard in its own process, retrying failed shards up to
+    SHARD_RETRIES times. Returns the partial output paths in shard order.
+    """
+    ensure_folder(SHARD_DIR)
+    threads = max(1, (os.cpu_count() or 1) // shard_count)
+    paths: Dict[int, str] = {}
+    pending = list(range(shard_count))
+
+    for attempt in range(SHARD_RETRIES + 1):
+        failed = []
+        with ProcessPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {
+                executor.submit(detect_shard, index, shard_count, threads): index
+                for index in pending
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    paths[index] = future.result()
+                except Exception as e:
+                    logger.error(f"Shard {index + 1}/{shard_count} failed (attempt {attempt + 1}): {e}")
+                    failed.append(index)
+
+        if not failed:
+            break
+        pending = sorted(failed)
+
+    if failed:
+        raise RuntimeError(
+            f"YOLO shards {[index + 1 for index in failed]} failed; completed shards are "
+            f"kept in {SHARD_DIR} and the next run resumes from them"
+        )
+    return [paths[index] for index in range(shard_count)]
+
+
+def merge_shards(paths: List[str]) -> List[dict]:
+    """Read partial outputs and order rows independently of shard timing."""
+    rows = []
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                row["confidence_score"] = float(row["confidence_score"])
+                rows.append(row)
+
+    rows.sort(key=lambda r: (
+        r["channel_name"], r["message_id"], r["image_path"],
+        r["detected_class"], -r["confidence_score"],
+    ))
+    return rows
+
+
+def run_sharded(shard_count: int) -> None:
+    """Split detection across worker processes and merge their outputs."""
+    logger.info(f"Running YOLO detection in {shard_count} shards")
+    if BACKEND != "torch":
+        # export once up front rather than racing to export in every shard
+        export_onnx(YOLO_MODEL, IMAGE_SIZE, quantize=BACKEND == "onnx-int8")
+    rows = merge_shards(run_shards(shard_count))
+
+    if OUTPUT_FORMAT == "postgres":
+        pass  # shards loaded their own rows
+    elif OUTPUT_FORMAT == "parquet":
+        write_detections_parquet(rows, PARQUET_DIR)
+    else:
+        tmp_path = f"{OUTPUT_CSV}.part"
+        with open(tmp_path, mode="w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, OUTPUT_CSV)
+
+    shutil.rmtree(SHARD_DIR, ignore_errors=True)
+
+
+def main(workers: int = WORKERS) -> None:
+    """Run YOLO detection on all images and save results to Postgres, CSV or Parquet."""
+    ensure_folder(ENRICHED_DIR)
+
+    if not os.path.exists(RAW_IMAGE_DIR):
+        logger.warning(f"No raw images found at {RAW_IMAGE_DIR}")
+        return
+
+    try:
+        if workers > 1:
+            run_sharded(workers)
+        else:
+            run_single_process()
     except OSError as e:
-        logger.exception(f"Failed to write CSV: {OUTPUT_CSV}")
+        logger.exception(f"Failed to write detections ({OUTPUT_FORMAT})")
         return
 
-    logger.info(f"YOLO detection complete! Results saved to: {OUTPUT_CSV}")
+    output = {
+        "postgres": "raw.yolo_detections / raw.yolo_image_summary",
+        "parquet": PARQUET_DIR,
+    }.get(OUTPUT_FORMAT, OUTPUT_CSV)
+    logger.info(f"YOLO detection complete! Results saved to: {output}")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
     main()
@@ -0,0 +1,144 @@
+"""
+ONNX Runtime backend for YOLO detection on CPU hosts.
+
+The PyTorch weights are exported to ONNX once (optionally int8-quantized)
+and the artifact is cached under data/models, keyed on the weights hash and
+input size. Inference runs through an ONNX Runtime session with a fixed
+number of intra-op threads and returns the same (class, confidence) pairs
+as the PyTorch path.
+"""
+
+import ast
+import os
+import logging
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+except ImportError:  # the ONNX backend is optional
+    ort = None
+
+from src.scraping.image_store import file_sha256
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = "data/models"
+CONF_THRESHOLD = 0.25  # ultralytics predict defaults
+IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+
+
+def require_onnxruntime():
+    if ort is None:
+        raise RuntimeError(
+            "The ONNX backend needs onnxruntime: pip install onnxruntime"
+        )
+
+
+def export_onnx(weights: str, image_size: int, quantize: bool = False,
+                cache_dir: str = MODEL_CACHE_DIR) -> Path:
+    """
+    Return the cached ONNX export of the weights, exporting (and
+    quantizing) it first if no artifact exists for this weights hash.
+    """
+    from ultralytics import YOLO
+
+    digest = file_sha256(weights)[:16] if os.path.exists(weights) else "hub"
+    suffix = "-int8" if quantize else ""
+    target = Path(cache_dir) / f"{Path(weights).stem}-{digest}-{image_size}{suffix}.onnx"
+    if target.exists():
+        return target
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Exporting {weights} to ONNX ({image_size}px, dynamic batch)")
+    exported = Path(YOLO(weights).export(format="onnx", imgsz=image_size, dynamic=True))
+
+    tmp_path = target.with_name(f".{target.name}.part")
+    if quantize:
+        require_onnxruntime()
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("Quantizing ONNX weights to int8")
+        quantize_dynamic(str(exported), str(tmp_path), weight_type=QuantType.QUInt8)
+        exported.unlink()
+    else:
+        os.replace(exported, tmp_path)
+    os.replace(tmp_path, target)
+    return target
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                        iou_threshold: float = IOU_THRESHOLD) -> List[int]:
+    """
+    Class-aware NMS over xyxy boxes; boxes of different classes are offset
+    apart so they never suppress each other.
+    """
+    offset = boxes + (class_ids * 7680)[:, None]
+    x1, y1, x2, y2 = offset.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size and len(keep) < MAX_DETECTIONS:
+        best = order[0]
+        keep.append(int(best))
+        rest = order[1:]
+        w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        inter = w * h
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+class OnnxDetector:
+    """
+    Runs an exported YOLOv8 model through ONNX Runtime. Expects images
+    already letterboxed to the export size (BGR, as decoded by OpenCV).
+    """
+
+    def __init__(self, onnx_path, threads: int = 1, conf_threshold: float = CONF_THRESHOLD):
+        require_onnxruntime()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(
+            str(onnx_path), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.conf_threshold = conf_threshold
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(metadata.get("names", "{}"))
+
+    def detect(self, images: List[np.ndarray]) -> List[List[Tuple[str, float]]]:
+        batch = np.stack(images)[..., ::-1].transpose(0, 3, 1, 2)  # BGR HWC -> RGB CHW
+        batch = np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+        (output,) = self.session.run(None, {self.input_name: batch})
+
+        # output: (batch, 4 + classes, anchors) with boxes as cx, cy, w, h
+        return [self._postprocess(prediction.T) for prediction in output]
+
+    def _postprocess(self, prediction: np.ndarray) -> List[Tuple[str, float]]:
+        class_scores = prediction[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+
+        mask = scores > self.conf_threshold
+        if not mask.any():
+            return []
+
+        cx, cy, w, h = prediction[mask, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        scores, class_ids = scores[mask], class_ids[mask]
+
+        keep = non_max_suppression(boxes, scores, class_ids)
+        return [
+            (self.names.get(int(class_ids[i]), str(int(class_ids[i]))), float(scores[i]))
+            for i in keep
+        ]